@@ -0,0 +1,185 @@
+# parallel move analysis over boards packed into shared memory
+# Dane Iwema
+# IT327
+
+from array import array
+from board_loader import parse_board
+from chess_move_checker import ENGINES
+from chess_utils import BoardInfo
+from concurrent.futures import ProcessPoolExecutor
+from move_tables import MOVE_CAPTURE
+from multiprocessing import shared_memory
+from position_corpus import PositionCorpus
+from position_corpus import RECORD_SIZE
+from position_corpus import pack_rows
+from position_corpus import unpack_rows
+import argparse
+import os
+import time
+
+# the shared blocks a worker process attached to in _attach
+_worker = {}
+
+
+def _mask_offset(count):
+    """returns where the 8 byte move masks start in the results block, after the 2 byte counts"""
+    return (2 * count + 7) // 8 * 8
+
+
+def _attach(positions_name, results_name, count, engine):
+    """worker initializer, attaches to the shared blocks once per process"""
+    _worker['positions'] = shared_memory.SharedMemory(positions_name)
+    _worker['results'] = shared_memory.SharedMemory(results_name)
+    _worker['count'] = count
+    _worker['engine'] = engine
+
+
+def analyze_range(start, stop):
+    """worker task, generates the white moves of boards start up to stop straight from the shared records
+
+    The move count and the mask of reachable squares of every board are written into the shared
+    results block, only the totals for the range go back through the pipe.
+
+    Returns:
+        type: tuple of (positions, moves, captures, most moves on one board)
+    """
+    positions = _worker['positions'].buf
+    results = _worker['results'].buf
+    engine = _worker['engine']
+    offset = _mask_offset(_worker['count'])
+    counts = results[:2 * _worker['count']].cast('H')
+    masks = results[offset:offset + 8 * _worker['count']].cast('Q')
+    try:
+        moves = None
+        total = captures = most = 0
+        for index in range(start, stop):
+            board = parse_board(unpack_rows(positions[index * RECORD_SIZE:(index + 1) * RECORD_SIZE]), engine)
+            moves, count = board.generate_all_moves(BoardInfo.WHITE, moves)
+            mask = 0
+            for move in moves[:count]:
+                mask |= 1 << (move >> 6 & 63)
+                if move >> 12 & MOVE_CAPTURE:
+                    captures += 1
+            counts[index] = count
+            masks[index] = mask
+            total += count
+            most = max(most, count)
+        return stop - start, total, captures, most
+    finally:
+        counts.release()
+        masks.release()
+
+
+class SharedPositions():
+    """boards packed as 32 byte position corpus records in a shared memory block, plus a results block
+    the workers fill in place
+
+    Attribues:
+        _count(Integer): the number of boards
+        _positions(SharedMemory): the packed boards, RECORD_SIZE bytes each
+        _results(SharedMemory): the move count (2 bytes) and reachable square mask (8 bytes) of every board
+    """
+
+    def __init__(self, records, count):
+        """SharedPositions initializer
+
+        Arguments:
+            records(bytes-like): count packed records back to back
+            count(Integer): the number of boards
+        """
+        self._count = count
+        self._positions = shared_memory.SharedMemory(create=True, size=max(1, count * RECORD_SIZE))
+        self._positions.buf[:count * RECORD_SIZE] = records
+        self._results = shared_memory.SharedMemory(create=True, size=max(1, _mask_offset(count) + 8 * count))
+
+    @classmethod
+    def from_rows(cls, boards_rows):
+        """packs boards given as their 8 text rows"""
+        records = b''.join(pack_rows(rows) for rows in boards_rows)
+        return cls(records, len(records) // RECORD_SIZE)
+
+    @classmethod
+    def from_corpus(cls, filename):
+        """copies every record of a position corpus file"""
+        with PositionCorpus(filename) as corpus:
+            records = corpus.records()
+            try:
+                return cls(records, len(corpus))
+            finally:
+                records.release()
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """frees both shared blocks"""
+        for block in (self._positions, self._results):
+            block.close()
+            block.unlink()
+
+    def analyze(self, workers=None, engine='classic', chunk_size=None):
+        """runs analyze_range over every board on a process pool and adds up the totals
+
+        Arguments:
+            workers(Integer): number of worker processes, None for one per cpu
+            engine(string): the move generation engine, one of ENGINES
+            chunk_size(Integer): boards per task, None for about 8 tasks per worker
+
+        Returns:
+            type: dictionary of the positions, moves, captures and most moves on one board
+        """
+        workers = workers or os.cpu_count() or 1
+        if chunk_size is None:
+            chunk_size = max(1, self._count // (8 * workers))
+        totals = {'positions': 0, 'moves': 0, 'captures': 0, 'max_moves': 0}
+        with ProcessPoolExecutor(workers, initializer=_attach,
+                                 initargs=(self._positions.name, self._results.name, self._count, engine)) as pool:
+            futures = [pool.submit(analyze_range, start, min(start + chunk_size, self._count))
+                       for start in range(0, self._count, chunk_size)]
+            for future in futures:
+                positions, moves, captures, most = future.result()
+                totals['positions'] += positions
+                totals['moves'] += moves
+                totals['captures'] += captures
+                totals['max_moves'] = max(totals['max_moves'], most)
+        return totals
+
+    def counts(self):
+        """returns the white move count of every board as an array('H')"""
+        counts = array('H')
+        counts.frombytes(self._results.buf[:2 * self._count])
+        return counts
+
+    def masks(self):
+        """returns the mask of squares white can move to on every board as an array('Q')"""
+        masks = array('Q')
+        offset = _mask_offset(self._count)
+        masks.frombytes(self._results.buf[offset:offset + 8 * self._count])
+        return masks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="count the white moves of every board in a position corpus")
+    parser.add_argument('corpus', help="position corpus file, see position_corpus.py")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: one per cpu)")
+    parser.add_argument('--engine', choices=ENGINES, default='classic')
+    parser.add_argument('--chunk', type=int, default=None, help="boards per task")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with SharedPositions.from_corpus(args.corpus) as shared:
+        totals = shared.analyze(args.workers, args.engine, args.chunk)
+    elapsed = time.perf_counter() - start
+    print("{positions} positions, {moves} moves, {captures} captures, at most {max_moves} moves on one board".format(
+        **totals))
+    print("{:.3f}s, {:.0f} positions/s".format(elapsed, totals['positions'] / elapsed if elapsed else 0.0))
+
+
+if __name__ == '__main__':
+    main()
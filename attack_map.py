@@ -0,0 +1,147 @@
+# per square attacker counts kept up to date as pieces move
+# Dane Iwema
+# IT327
+
+from chess_utils import BoardInfo
+from chess_utils import PieceInfo
+from move_tables import BLACK_PAWN_CAPTURES
+from move_tables import BOARD_SIZE
+from move_tables import KING_TARGETS
+from move_tables import KNIGHT_TARGETS
+from move_tables import PAWN_CAPTURES
+from move_tables import RAYS
+from move_tables import SLIDER_DIRECTIONS
+from piece_colors import BlackPieceInfo
+
+# the squares a non sliding piece attacks, by label, indexed by square
+JUMP_ATTACKS = {
+    PieceInfo.WHITE_KNIGHT.value: KNIGHT_TARGETS,
+    PieceInfo.WHITE_KING.value: KING_TARGETS,
+    PieceInfo.WHITE_PAWN.value: PAWN_CAPTURES,
+    BlackPieceInfo.BLACK_KNIGHT.value: KNIGHT_TARGETS,
+    BlackPieceInfo.BLACK_KING.value: KING_TARGETS,
+    BlackPieceInfo.BLACK_PAWN.value: BLACK_PAWN_CAPTURES,
+}
+
+# the directions a sliding piece attacks along, by label
+SLIDE_ATTACKS = {PieceInfo.WHITE_QUEEN.value: SLIDER_DIRECTIONS['Q'],
+                 PieceInfo.WHITE_BISHOP.value: SLIDER_DIRECTIONS['B'],
+                 PieceInfo.WHITE_ROOK.value: SLIDER_DIRECTIONS['R'],
+                 BlackPieceInfo.BLACK_QUEEN.value: SLIDER_DIRECTIONS['q'],
+                 BlackPieceInfo.BLACK_BISHOP.value: SLIDER_DIRECTIONS['b'],
+                 BlackPieceInfo.BLACK_ROOK.value: SLIDER_DIRECTIONS['r']}
+
+KING_LABELS = (PieceInfo.WHITE_KING.value, BlackPieceInfo.BLACK_KING.value)
+
+
+class AttackMap():
+    """counts, for every square, how many white and how many black pieces attack it
+
+    A square is attacked by a piece if the piece could capture something standing there, so
+    pawns attack their diagonals and squares holding a piece of the same color still count.
+    Pieces with no known movement (the generic BlackPiece) attack nothing.
+
+    Attribues:
+        _board(FastBoard): the board being tracked
+        _counts(dictionary): BoardInfo color to a list of 64 attacker counts
+        _attackers(list): for every square, the set of squares holding a piece that attacks it
+        _attacks(list): for every square, the squares the piece standing there attacks
+        _colors(list): for every square, the color of the piece whose attacks are stored
+        _sliders(list): for every square, True if the piece standing there slides
+        _kings(dictionary): BoardInfo color to the set of squares holding a king of that color
+    """
+
+    def __init__(self, board):
+        """AttackMap initializer, scans every square of the board once
+
+        Arguments:
+            board(FastBoard): the board to track
+        """
+        self._board = board
+        self._counts = {BoardInfo.WHITE: [0] * 64, BoardInfo.BLACK: [0] * 64}
+        self._attackers = [set() for _ in range(64)]
+        self._attacks = [()] * 64
+        self._colors = [None] * 64
+        self._sliders = [False] * 64
+        self._kings = {BoardInfo.WHITE: set(), BoardInfo.BLACK: set()}
+        for square in range(64):
+            self._add(square)
+
+    def _compute(self, square, piece):
+        """returns the squares the piece standing on square attacks"""
+        label = piece.get_label_char()
+        jumps = JUMP_ATTACKS.get(label)
+        if jumps is not None:
+            return [row * BOARD_SIZE + col for row, col in jumps[square]]
+        directions = SLIDE_ATTACKS.get(label)
+        if directions is None:
+            return []
+        attacks = []
+        for direction in directions:
+            for row, col in RAYS[square][direction]:
+                attacks.append(row * BOARD_SIZE + col)
+                if self._board.get_piece(row, col) is not None:
+                    break
+        return attacks
+
+    def _add(self, square):
+        """records the attacks of the piece currently on square"""
+        piece = self._board.get_piece(square // BOARD_SIZE, square % BOARD_SIZE)
+        if piece is None:
+            return
+        color = piece.get_color()
+        counts = self._counts.get(color)
+        if counts is None:
+            return
+        attacks = self._compute(square, piece)
+        for target in attacks:
+            self._attackers[target].add(square)
+            counts[target] += 1
+        self._attacks[square] = attacks
+        self._colors[square] = color
+        label = piece.get_label_char()
+        self._sliders[square] = label in SLIDE_ATTACKS
+        if label in KING_LABELS:
+            self._kings[color].add(square)
+
+    def _remove(self, square):
+        """forgets the attacks recorded for square"""
+        color = self._colors[square]
+        if color is None:
+            return
+        counts = self._counts[color]
+        for target in self._attacks[square]:
+            self._attackers[target].discard(square)
+            counts[target] -= 1
+        self._attacks[square] = ()
+        self._colors[square] = None
+        self._sliders[square] = False
+        self._kings[color].discard(square)
+
+    def square_changed(self, row, col):
+        """updates the map after the piece on (row, col) was added, removed or replaced
+
+        Only the piece on the square and the sliding pieces whose rays reach the square are rescanned.
+        """
+        square = row * BOARD_SIZE + col
+        sliders = [origin for origin in self._attackers[square] if self._sliders[origin] and origin != square]
+        self._remove(square)
+        self._add(square)
+        for origin in sliders:
+            self._remove(origin)
+            self._add(origin)
+
+    def attack_counts(self, row, col):
+        """returns (white attackers, black attackers) for a square"""
+        square = row * BOARD_SIZE + col
+        return self._counts[BoardInfo.WHITE][square], self._counts[BoardInfo.BLACK][square]
+
+    def is_attacked(self, row, col, by_color):
+        """returns True if any piece of by_color attacks the square"""
+        return self._counts[by_color][row * BOARD_SIZE + col] > 0
+
+    def is_in_check(self, color=BoardInfo.WHITE):
+        """returns True if a king of the given color stands on a square the other color attacks"""
+        other = BoardInfo.BLACK if color == BoardInfo.WHITE else BoardInfo.WHITE
+        counts = self._counts[other]
+        return any(counts[square] for square in self._kings[color])
@@ -0,0 +1,108 @@
+# runs many chess_move_checker command files across a pool of worker processes
+# Dane Iwema
+# IT327
+
+from chess_move_checker import ENGINES
+from chess_move_checker import process_file
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+
+
+def find_input_files(source):
+    """lists the input files for a directory or a glob pattern, sorted so runs are repeatable
+
+    Arguments:
+        source(string): a directory holding command files or a glob pattern
+
+    Returns:
+        type: sorted list of file names
+    """
+    if os.path.isdir(source):
+        names = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        names = glob.glob(source)
+    return sorted(name for name in names if os.path.isfile(name))
+
+
+def run_job(job):
+    """worker entry point, processes one input file into its output file
+
+    Arguments:
+        job(tuple): (input file name, output file name, engine, delta)
+
+    Returns:
+        type: tuple of the input file name, the number of commands and the seconds it took
+    """
+    infilename, outfilename, engine, delta = job
+    start = time.perf_counter()
+    commands = process_file(infilename, outfilename, engine, verbose=False, delta=delta)
+    return infilename, commands, time.perf_counter() - start
+
+
+def output_names(infilenames, output_dir):
+    """names each output file by its input file's path relative to the folder all the inputs share,
+    so inputs with the same name in different folders get separate output files
+
+    Arguments:
+        infilenames(list): the command files to process
+        output_dir(string): directory for the output files
+
+    Returns:
+        type: list of output file names in the same order as infilenames
+    """
+    if not infilenames:
+        return []
+    folders = [os.path.dirname(os.path.abspath(name)) for name in infilenames]
+    root = os.path.commonpath(folders)
+    return [os.path.join(output_dir, os.path.relpath(os.path.abspath(name), root)) for name in infilenames]
+
+
+def run_jobs(infilenames, output_dir, workers=None, engine='classic', delta=False):
+    """fans the input files out over a process pool, each job writes its own output file as it runs
+
+    Arguments:
+        infilenames(list): the command files to process
+        output_dir(string): directory for the output files, laid out like the input files (see output_names)
+        workers(Integer): number of worker processes, None for one per cpu and 1 to run serially
+        engine(string): the move generation engine, one of ENGINES
+        delta(boolean): write only the move after makeMove instead of the whole board
+
+    Returns:
+        type: list of (input file name, commands, seconds) in the same order as infilenames
+    """
+    outfilenames = output_names(infilenames, output_dir)
+    for folder in {os.path.dirname(name) for name in outfilenames} | {output_dir}:
+        os.makedirs(folder, exist_ok=True)
+    jobs = [(name, outfilename, engine, delta) for name, outfilename in zip(infilenames, outfilenames)]
+    if workers == 1:
+        return [run_job(job) for job in jobs]
+    with multiprocessing.Pool(workers) as pool:
+        return list(pool.imap(run_job, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run chess_move_checker over many command files")
+    parser.add_argument('source', help="directory of command files or a glob pattern")
+    parser.add_argument('output_dir', help="directory for the output files")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: one per cpu)")
+    parser.add_argument('--engine', choices=ENGINES, default='classic')
+    parser.add_argument('--delta', action='store_true', help="write only the move after makeMove, not the board")
+    args = parser.parse_args(argv)
+
+    infilenames = find_input_files(args.source)
+    start = time.perf_counter()
+    results = run_jobs(infilenames, args.output_dir, args.workers, args.engine, args.delta)
+    elapsed = time.perf_counter() - start
+
+    commands = sum(result[1] for result in results)
+    print("files: " + str(len(results)) + "  commands: " + str(commands) +
+          "  seconds: {:.3f}".format(elapsed))
+    if elapsed > 0:
+        print("{:.1f} files/s  {:.0f} commands/s".format(len(results) / elapsed, commands / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# scaling benchmark for the shared memory analysis pipeline against pickling whole boards to workers
+# Dane Iwema
+# IT327
+
+from analysis_pipeline import SharedPositions
+from board_loader import parse_board
+from chess_move_checker import ENGINES
+from chess_utils import BoardInfo
+from concurrent.futures import ProcessPoolExecutor
+from position_corpus import build_corpus
+import argparse
+import os
+import time
+
+
+def count_board_moves(board):
+    """pickled pipeline task, the board itself travels to the worker"""
+    return board.generate_all_moves(BoardInfo.WHITE)[1]
+
+
+def pickled_rate(boards, workers):
+    """returns positions per second when every board is pickled to the pool, and the total move count"""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        total = sum(pool.map(count_board_moves, boards, chunksize=max(1, len(boards) // (8 * workers))))
+    return len(boards) / (time.perf_counter() - start), total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="time the analysis pipeline at 1, 2, 4 and one worker per cpu")
+    parser.add_argument('--positions', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--engine', choices=ENGINES, default='classic')
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.positions, args.seed)
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    print("{} positions, {} cpus".format(args.positions, os.cpu_count()))
+    print("{:>8} {:>14} {:>8} {:>16}".format('workers', 'positions/s', 'speedup', 'pickled boards/s'))
+    with SharedPositions.from_rows(corpus) as shared:
+        baseline = None
+        expected = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            totals = shared.analyze(workers, args.engine)
+            rate = args.positions / (time.perf_counter() - start)
+            baseline = baseline or rate
+            # every worker count has to produce the same totals
+            if expected is None:
+                expected = totals
+            elif totals != expected:
+                raise AssertionError("{} workers gave {} instead of {}".format(workers, totals, expected))
+            pickled, moves = pickled_rate([parse_board(rows, args.engine) for rows in corpus], workers)
+            if moves != totals['moves']:
+                raise AssertionError("pickled boards gave {} moves instead of {}".format(moves, totals['moves']))
+            print("{:>8} {:>14.0f} {:>7.2f}x {:>16.0f}".format(workers, rate, rate / baseline, pickled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# benchmark for boards parsed per second by the bulk loader and the original per character read_board
+# Dane Iwema
+# IT327
+
+from bench_board_memory import random_board_text
+from bench_check_move import BASELINE_REVISION
+from bench_check_move import load_baseline
+from bench_check_move import resolve_revision
+from board_loader import iter_boards
+from chess_move_checker import ENGINES
+import argparse
+import ast
+import io
+import os
+import random
+import subprocess
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# the functions of the original chess_move_checker that loaded a board
+LEGACY_FUNCTIONS = ('make_piece', 'read_board')
+
+
+def load_legacy_read_board(revision):
+    """returns the read_board of chess_move_checker as it was at revision, building the pieces of that revision
+
+    The original program runs its command loop at import, so only its imports and the functions in
+    LEGACY_FUNCTIONS are taken from the source and run, then the piece classes are pointed at the
+    baseline my_pieces.
+
+    Returns:
+        type: the original read_board(infile) function
+    """
+    source = subprocess.check_output(['git', 'show', revision + ':chess_move_checker.py'], cwd=HERE, text=True)
+    tree = ast.parse(source)
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)) or
+                 isinstance(node, ast.FunctionDef) and node.name in LEGACY_FUNCTIONS]
+    namespace = {'__name__': 'chess_move_checker@' + revision}
+    exec(compile(tree, 'chess_move_checker.py@' + revision, 'exec'), namespace)
+    pieces = load_baseline(revision)
+    for name in ('Knight', 'Rook', 'WhitePawn', 'Bishop', 'Queen'):
+        namespace[name] = getattr(pieces, name)
+    return namespace['read_board']
+
+
+def boards_per_second(load, text, count):
+    """times a loader over the text of count boards"""
+    start = time.perf_counter()
+    load(io.StringIO(text))
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="boards parsed per second, original read_board against the bulk loader")
+    parser.add_argument('boards', type=int, nargs='?', default=20000)
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--baseline', metavar='REV', default=BASELINE_REVISION,
+                        help="revision with the original read_board (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        legacy_read_board = load_legacy_read_board(resolve_revision(args.baseline))
+    except ValueError as error:
+        parser.error(str(error))
+    except subprocess.CalledProcessError:
+        parser.error("revision {} does not have the original chess_move_checker.py and pieces".format(args.baseline))
+    count = args.boards
+    rng = random.Random(args.seed)
+    text = ''.join(random_board_text(rng) for _ in range(count))
+
+    def legacy(infile):
+        return [legacy_read_board(infile) for _ in range(count)]
+
+    print("boards parsed per second over " + str(count) + " boards")
+    print("{:<10} {:>10.0f}".format('read_board', boards_per_second(legacy, text, count)))
+    for engine in ENGINES:
+        rate = boards_per_second(lambda infile: list(iter_boards(infile, engine)), text, count)
+        print("{:<10} {:>10.0f}".format(engine, rate))
+
+
+if __name__ == '__main__':
+    main()
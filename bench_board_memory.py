@@ -0,0 +1,51 @@
+# memory benchmark for the per board footprint of each engine's loaded boards
+# Dane Iwema
+# IT327
+
+from chess_move_checker import ENGINES
+from chess_move_checker import read_board
+from chess_utils import PieceInfo
+import argparse
+import gc
+import io
+import random
+import tracemalloc
+
+
+def random_board_text(rng, pieces=16):
+    """builds the 8 lines of a readBoard block with random white and black pieces"""
+    labels = [info.value for info in PieceInfo if info != PieceInfo.EMPTY]
+    squares = [[PieceInfo.EMPTY.value] * 8 for _ in range(8)]
+    for square in rng.sample(range(64), pieces):
+        squares[square // 8][square % 8] = rng.choice(labels)
+    return ''.join(''.join(row) + '\n' for row in squares)
+
+
+def measure(engine, corpus):
+    """loads every board in the corpus and returns the traced bytes per board that stay allocated"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    boards = [read_board(io.StringIO(text), engine) for text in corpus]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del boards
+    return (after - before) / len(corpus)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="memory kept per loaded board for each engine")
+    parser.add_argument('boards', type=int, nargs='?', default=100000)
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    corpus = [random_board_text(rng) for _ in range(args.boards)]
+    print("bytes per loaded board over " + str(args.boards) + " boards")
+    for engine in args.engines:
+        print("{:<10} {:>10.0f}".format(engine, measure(engine, corpus)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# benchmark for command files that alternate positions, reparsing each time against useBoard on pooled boards
+# Dane Iwema
+# IT327
+
+from bench_board_memory import random_board_text
+from chess_move_checker import ENGINES
+from chess_move_checker import process_commands
+import argparse
+import io
+import random
+import time
+
+
+def build_scripts(rng, positions, switches, commands_per_switch):
+    """returns (reparsing script, pooled script) running the same read only commands on the same positions"""
+    texts = [random_board_text(rng) for _ in range(positions)]
+    reparse = []
+    pooled = ['readBoard {}\n{}'.format(index, text) for index, text in enumerate(texts)]
+    for _ in range(switches):
+        index = rng.randrange(positions)
+        commands = []
+        for _ in range(commands_per_switch):
+            row, col, to_row, to_col = (rng.randrange(8) for _ in range(4))
+            commands.append("checkMove {} {} {} {}\n".format(row, col, to_row, to_col))
+        commands.append("genPossMoves {} {}\n".format(rng.randrange(8), rng.randrange(8)))
+        reparse.append('readBoard\n' + texts[index] + ''.join(commands))
+        pooled.append('useBoard {}\n'.format(index) + ''.join(commands))
+    return ''.join(reparse) + 'quit\n', ''.join(pooled) + 'quit\n'
+
+
+def run(script, engine):
+    """runs a script, returning (seconds, output text)"""
+    outfile = io.StringIO()
+    start = time.perf_counter()
+    process_commands(io.StringIO(script), outfile, engine)
+    return time.perf_counter() - start, outfile.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="alternating positions with readBoard against useBoard")
+    parser.add_argument('--positions', type=int, default=32)
+    parser.add_argument('--switches', type=int, default=20000)
+    parser.add_argument('--commands', type=int, default=2, help="checkMove commands run after each switch")
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    args = parser.parse_args(argv)
+
+    reparse, pooled = build_scripts(random.Random(args.seed), args.positions, args.switches, args.commands)
+    print("{} switches between {} positions, time per switch".format(args.switches, args.positions))
+    print("{:<10} {:>12} {:>12} {:>8}".format('engine', 'readBoard us', 'useBoard us', 'same'))
+    for engine in args.engines:
+        reparse_time, reparse_text = run(reparse, engine)
+        pooled_time, pooled_text = run(pooled, engine)
+        print("{:<10} {:>12.1f} {:>12.1f} {:>8}".format(
+            engine, reparse_time / args.switches * 1e6, pooled_time / args.switches * 1e6,
+            'yes' if reparse_text == pooled_text else 'NO'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# micro-benchmark for checkMove latency on each piece type, before and after the precomputed move tables
+# Dane Iwema
+# IT327
+
+from board import Board
+from mec_pieces import BlackPiece
+import argparse
+import my_pieces
+import os
+import random
+import subprocess
+import sys
+import time
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PIECE_NAMES = ['Knight', 'Rook', 'WhitePawn', 'Bishop', 'Queen']
+
+# the modules the move tables replaced, loaded from the baseline revision for the "before" numbers
+BASELINE_MODULES = ('chess_piece', 'my_pieces')
+
+# the commit holding the original piece code
+BASELINE_REVISION = '9b2f9d6'
+
+
+def resolve_revision(revision):
+    """returns the full commit id of revision
+
+    Raises:
+        ValueError: git is missing, this is not a repository, or the revision is not in its history
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--verify', '--quiet', revision + '^{commit}'],
+                                       cwd=HERE, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        raise ValueError("baseline revision {} could not be resolved, it needs a git checkout whose history "
+                         "has it (not a shallow clone or an export), or pass --baseline REV".format(revision))
+
+
+def load_baseline(revision):
+    """loads chess_piece and my_pieces as they were at revision, without disturbing the current modules
+
+    The old sources are run as modules of their own, with sys.modules pointing at them only while they
+    import each other.
+
+    Returns:
+        type: the baseline my_pieces module
+    """
+    saved = {name: sys.modules.get(name) for name in BASELINE_MODULES}
+    try:
+        for name in BASELINE_MODULES:
+            source = subprocess.check_output(['git', 'show', revision + ':' + name + '.py'], cwd=HERE, text=True)
+            module = types.ModuleType(name)
+            module.__file__ = name + '.py@' + revision
+            sys.modules[name] = module
+            exec(compile(source, module.__file__, 'exec'), module.__dict__)
+        return sys.modules['my_pieces']
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def random_position(pieces, piece_name, rng, blockers=12):
+    """builds a Board holding one piece of the named type plus random white and black blockers
+
+    Arguments:
+        pieces(module): the my_pieces module the piece classes come from
+        piece_name(string): the class name of the piece being measured
+        rng(Random): the seeded random number generator
+        blockers(Integer): how many other pieces to scatter on the board
+
+    Returns:
+        type: a tuple of the board and the measured piece's (row, col)
+    """
+    board = Board()
+    squares = rng.sample(range(64), blockers + 1)
+    row, col = divmod(squares[0], Board.BOARD_SIZE)
+    board.add_piece(row, col, getattr(pieces, piece_name)(row, col))
+    for square in squares[1:]:
+        block_row, block_col = divmod(square, Board.BOARD_SIZE)
+        blocker = BlackPiece(block_row, block_col) if rng.random() < 0.5 else pieces.Knight(block_row, block_col)
+        board.add_piece(block_row, block_col, blocker)
+    return board, (row, col)
+
+
+def time_piece_type(pieces, piece_name, positions, seed):
+    """times Board.check_move, the call the driver makes for checkMove, against all 64 destinations
+
+    Returns:
+        type: (average nanoseconds per call, number of calls that raised)
+    """
+    rng = random.Random(seed)
+    setups = [random_position(pieces, piece_name, rng) for _ in range(positions)]
+    destinations = [divmod(square, Board.BOARD_SIZE) for square in range(64)]
+    errors = 0
+    start = time.perf_counter()
+    for board, (row, col) in setups:
+        for dest_row, dest_col in destinations:
+            try:
+                board.check_move(row, col, dest_row, dest_col)
+            except (KeyError, IndexError):
+                # the original pawn raised KeyError for sideways and backwards destinations
+                errors += 1
+    elapsed = time.perf_counter() - start
+    return elapsed * 1e9 / (positions * len(destinations)), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="checkMove latency per piece type, baseline against current")
+    parser.add_argument('positions', type=int, nargs='?', default=2000)
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--baseline', metavar='REV', default=BASELINE_REVISION,
+                        help="revision with the original pieces (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        baseline = load_baseline(resolve_revision(args.baseline))
+    except ValueError as error:
+        parser.error(str(error))
+    except subprocess.CalledProcessError:
+        parser.error("revision {} does not have {}".format(
+            args.baseline, ' and '.join(name + '.py' for name in BASELINE_MODULES)))
+
+    print("Board.check_move latency over {} positions x 64 destinations, ns/call".format(args.positions))
+    print("{:<10} {:>10} {:>10} {:>8}".format('piece', 'before', 'after', 'speedup'))
+    for piece_name in PIECE_NAMES:
+        after, _ = time_piece_type(my_pieces, piece_name, args.positions, args.seed)
+        before, errors = time_piece_type(baseline, piece_name, args.positions, args.seed)
+        note = "  ({} calls raised)".format(errors) if errors else ''
+        print("{:<10} {:>10.0f} {:>10.0f} {:>7.1f}x{}".format(piece_name, before, after, before / after, note))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# benchmark and correctness suite for the piece move generators
+# Dane Iwema
+# IT327
+
+from board_loader import parse_board
+from chess_move_checker import ENGINES
+from chess_utils import PieceInfo
+from piece_colors import BLACK_LABELS
+from position_corpus import build_corpus
+import argparse
+import json
+import os
+import time
+
+# the piece labels measured, in the order they are reported
+_WHITE_MEASURED = [PieceInfo.WHITE_KNIGHT, PieceInfo.WHITE_ROOK, PieceInfo.WHITE_PAWN,
+                   PieceInfo.WHITE_BISHOP, PieceInfo.WHITE_QUEEN, PieceInfo.WHITE_KING]
+PIECE_LABELS = ([info.value for info in _WHITE_MEASURED] +
+                [BLACK_LABELS[info].value for info in _WHITE_MEASURED])
+
+
+def collect_pieces(corpus, engine):
+    """loads every position and groups its pieces of both colors by label, the labels in PIECE_LABELS
+
+    Returns:
+        type: dictionary from label to a list of (board, row, col)
+    """
+    grouped = {label: [] for label in PIECE_LABELS}
+    for rows in corpus:
+        board = parse_board(rows, engine)
+        for row in range(8):
+            for col in range(8):
+                if rows[row][col] in grouped:
+                    grouped[rows[row][col]].append((board, row, col))
+    return grouped
+
+
+def measure(entries):
+    """times is_legal_move and generate_legal_moves and cross checks them
+
+    Arguments:
+        entries(list): (board, row, col) for every piece of one type
+
+    Returns:
+        type: dictionary of the rates in calls per second and the cross check results
+    """
+    destinations = [divmod(square, 8) for square in range(64)]
+    calls = 0
+    start = time.perf_counter()
+    for board, row, col in entries:
+        piece = board.get_piece(row, col)
+        for dest_row, dest_col in destinations:
+            piece.is_legal_move(dest_row, dest_col, board)
+        calls += len(destinations)
+    legal_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for board, row, col in entries:
+        board.get_piece(row, col).generate_legal_moves([[PieceInfo.EMPTY.value] * 8 for _ in range(8)], board)
+    generate_time = time.perf_counter() - start
+
+    # every is_legal_move answer has to agree with membership in the generated set
+    mismatches = []
+    for board, row, col in entries:
+        piece = board.get_piece(row, col)
+        pos_moves = piece.get_legal_moves(board)
+        for dest_row, dest_col in destinations:
+            if piece.is_legal_move(dest_row, dest_col, board) != ((dest_row, dest_col) in pos_moves):
+                mismatches.append([row, col, dest_row, dest_col])
+
+    return {'pieces': len(entries),
+            'is_legal_move_per_s': calls / legal_time if legal_time else 0.0,
+            'generate_legal_moves_per_s': len(entries) / generate_time if generate_time else 0.0,
+            'mismatches': len(mismatches),
+            'first_mismatches': mismatches[:5]}
+
+
+def load_history(filename):
+    """returns the list of earlier runs stored in the results file"""
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'r') as infile:
+        return json.load(infile)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark and cross check the piece move generators")
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--engine', choices=ENGINES, default='classic')
+    parser.add_argument('--results', default='bench_results.json', help="JSON file the runs are appended to")
+    args = parser.parse_args(argv)
+
+    # the board setup does not use flyweights, each measured piece needs its own coordinates
+    engine = 'classic' if args.engine == 'flyweight' else args.engine
+    grouped = collect_pieces(build_corpus(args.positions, args.seed), engine)
+    run = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'engine': engine,
+           'positions': args.positions, 'seed': args.seed, 'pieces': {}}
+    for label in PIECE_LABELS:
+        run['pieces'][label] = measure(grouped[label])
+
+    history = load_history(args.results)
+    previous = next((old for old in reversed(history)
+                     if old['engine'] == engine and old['positions'] == args.positions and old['seed'] == args.seed), None)
+    print("{:<6} {:>16} {:>16} {:>11}".format('piece', 'is_legal_move/s', 'generate/s', 'mismatches'))
+    for label, result in run['pieces'].items():
+        line = "{:<6} {:>16.0f} {:>16.0f} {:>11}".format(
+            label, result['is_legal_move_per_s'], result['generate_legal_moves_per_s'], result['mismatches'])
+        if previous is not None and label in previous['pieces']:
+            old = previous['pieces'][label]
+            if old['is_legal_move_per_s'] and old['generate_legal_moves_per_s']:
+                line += "  ({:+.0%} / {:+.0%} vs {})".format(
+                    result['is_legal_move_per_s'] / old['is_legal_move_per_s'] - 1,
+                    result['generate_legal_moves_per_s'] / old['generate_legal_moves_per_s'] - 1, previous['time'])
+        print(line)
+
+    history.append(run)
+    with open(args.results, 'w') as outfile:
+        json.dump(history, outfile, indent=1)
+    return run
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# benchmark for whoCanReach answered by the incremental reach index against asking every piece
+# Dane Iwema
+# IT327
+
+from bench_self_play import START_POSITION
+from chess_move_checker import ENGINES
+from chess_move_checker import read_board
+from chess_utils import BoardInfo
+import argparse
+import io
+import random
+import time
+
+
+def brute_force_reachers(board, row, col, color):
+    """the squares of every piece of one color whose is_legal_move accepts (row, col)"""
+    origins = []
+    for from_row in range(8):
+        for from_col in range(8):
+            if board.get_square_info(from_row, from_col) != color:
+                continue
+            piece = board.get_piece(from_row, from_col)
+            if piece is not None and piece.is_legal_move(row, col, board):
+                origins.append((from_row, from_col))
+    return origins
+
+
+def play(engine, plies, queries, seed, answer):
+    """plays random moves for both sides, asking answer(board, row, col) about random squares after each
+
+    Returns:
+        type: (seconds spent in make_move and the queries, list of every answer)
+    """
+    rng = random.Random(seed)
+    board = read_board(io.StringIO(START_POSITION), engine)
+    color = BoardInfo.WHITE
+    moves = None
+    answers = []
+    elapsed = 0.0
+    for _ in range(plies):
+        moves, count = board.generate_all_moves(color, moves)
+        if count == 0:
+            board = read_board(io.StringIO(START_POSITION), engine)
+            color = BoardInfo.WHITE
+            continue
+        move = sorted(moves[:count])[rng.randrange(count)]
+        squares = [divmod(rng.randrange(64), 8) for _ in range(queries)]
+        start = time.perf_counter()
+        board.make_move(*divmod(move & 63, 8), *divmod(move >> 6 & 63, 8))
+        for row, col in squares:
+            answers.append(answer(board, row, col))
+        elapsed += time.perf_counter() - start
+        color = BoardInfo.BLACK if color == BoardInfo.WHITE else BoardInfo.WHITE
+    return elapsed, answers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="whoCanReach through the reach index against brute force")
+    parser.add_argument('--plies', type=int, default=2000)
+    parser.add_argument('--queries', type=int, nargs='+', default=[1, 4, 16], help="queries asked after each ply")
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    args = parser.parse_args(argv)
+
+    def indexed(board, row, col):
+        return board.who_can_reach(row, col, BoardInfo.WHITE)
+
+    def brute_force(board, row, col):
+        return brute_force_reachers(board, row, col, BoardInfo.WHITE)
+
+    board = read_board(io.StringIO(START_POSITION), args.engines[0])
+    start = time.perf_counter()
+    board.get_reach_index()
+    print("index build from the starting position {:.1f} us".format((time.perf_counter() - start) * 1e6))
+
+    print("{} plies from the starting position, time per ply including make_move".format(args.plies))
+    print("{:<10} {:>8} {:>12} {:>12} {:>8}".format('engine', 'queries', 'index us', 'brute us', 'same'))
+    for engine in args.engines:
+        for queries in args.queries:
+            index_time, index_answers = play(engine, args.plies, queries, args.seed, indexed)
+            brute_time, brute_answers = play(engine, args.plies, queries, args.seed, brute_force)
+            print("{:<10} {:>8} {:>12.1f} {:>12.1f} {:>8}".format(
+                engine, queries, index_time / args.plies * 1e6, brute_time / args.plies * 1e6,
+                'yes' if index_answers == brute_answers else 'NO'))
+
+
+if __name__ == '__main__':
+    main()
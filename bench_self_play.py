@@ -0,0 +1,169 @@
+# self play load test, random legal moves for both sides through make_move for many plies
+# Dane Iwema
+# IT327
+
+from board_loader import is_read_board
+from chess_move_checker import ENGINES
+from chess_move_checker import read_board
+from chess_utils import BoardInfo
+from chess_utils import PieceInfo
+from concurrent.futures import ProcessPoolExecutor
+from piece_colors import BlackPieceInfo
+import argparse
+import io
+import random
+import resource
+import statistics
+import time
+import tracemalloc
+
+# the usual starting position, white starts on rows 0 and 1 and moves toward the higher rows
+START_POSITION = ''.join(row + '\n' for row in [
+    'RNBQKBNR', 'PPPPPPPP', '........', '........', '........', '........', 'pppppppp', 'rnbqkbnr'])
+
+KING_LABELS = (PieceInfo.WHITE_KING.value, BlackPieceInfo.BLACK_KING.value)
+
+
+def first_board_text(filename):
+    """returns the 8 lines of the first readBoard block in a command file"""
+    with open(filename, 'r') as infile:
+        for line in infile:
+            if is_read_board(line):
+                return ''.join(infile.readline() for _ in range(8))
+    raise ValueError(filename + " has no readBoard command")
+
+
+class SelfPlay():
+    """plays random games from one starting board, restarting whenever a game ends
+
+    A game ends when the side to move has no moves, a king is taken or it reaches max_game_plies.
+    The moves of each ply are sorted before one is picked, so every engine plays the same games
+    for the same seed and ends with the same checksum.
+
+    Attribues:
+        board_text(string): the starting board as the 8 lines of a readBoard block
+        engine(string): the move generation engine, one of ENGINES
+        max_game_plies(Integer): the longest a game may run before it is restarted
+        games(Integer): the number of games started
+        checksum(Integer): a running hash of every move played
+    """
+
+    def __init__(self, board_text, engine, seed, max_game_plies=200):
+        """SelfPlay initializer
+
+        Arguments:
+            board_text(string): the starting board as the 8 lines of a readBoard block
+            engine(string): the move generation engine, one of ENGINES
+            seed(Integer): seed for the move choices
+            max_game_plies(Integer): the longest a game may run before it is restarted
+        """
+        self.board_text = board_text
+        self.engine = engine
+        self.max_game_plies = max_game_plies
+        self.games = 0
+        self.checksum = 0
+        self._rng = random.Random(seed)
+        self._moves = None
+        self._restart()
+
+    def _restart(self):
+        self._board = read_board(io.StringIO(self.board_text), self.engine)
+        self._color = BoardInfo.WHITE
+        self._game_plies = 0
+        self.games += 1
+
+    def ply(self):
+        """plays one move for the side to move, or starts a new game if the current one is over"""
+        board = self._board
+        self._moves, count = board.generate_all_moves(self._color, self._moves)
+        if count == 0 or self._game_plies >= self.max_game_plies:
+            self._restart()
+            return
+        move = sorted(self._moves[:count])[self._rng.randrange(count)]
+        from_row, from_col = divmod(move & 63, 8)
+        to_row, to_col = divmod(move >> 6 & 63, 8)
+        captured = board.get_piece(to_row, to_col)
+        if not board.make_move(from_row, from_col, to_row, to_col):
+            raise AssertionError("generated move {} {} {} {} was refused".format(from_row, from_col, to_row, to_col))
+        self.checksum = (self.checksum * 31 + move) & 0xFFFFFFFF
+        self._game_plies += 1
+        self._color = BoardInfo.BLACK if self._color == BoardInfo.WHITE else BoardInfo.WHITE
+        if captured is not None and captured.get_label().value in KING_LABELS:
+            self._restart()
+
+    def run(self, plies):
+        for _ in range(plies):
+            self.ply()
+
+
+def measure(engine, board_text, plies, seed, trace_plies, max_game_plies):
+    """runs in its own worker process so the peak RSS belongs to one engine
+
+    Returns:
+        type: dictionary of the results
+    """
+    game = SelfPlay(board_text, engine, seed, max_game_plies)
+    start = time.perf_counter()
+    game.run(plies)
+    elapsed = time.perf_counter() - start
+    result = {'engine': engine, 'plies': plies, 'plies_per_s': plies / elapsed if elapsed else 0.0,
+              'games': game.games, 'checksum': game.checksum}
+
+    # a second, shorter game under tracemalloc, per ply it records how far the traced memory
+    # rose above where the ply started (the temporary allocations) and what it kept
+    traced = SelfPlay(board_text, engine, seed, max_game_plies)
+    tracemalloc.start()
+    transient = 0
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    for _ in range(trace_plies):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        traced.ply()
+        transient += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - start_bytes
+    tracemalloc.stop()
+    result['transient_bytes_per_ply'] = transient / trace_plies if trace_plies else 0.0
+    result['retained_bytes_per_ply'] = retained / trace_plies if trace_plies else 0.0
+    # ru_maxrss is in KiB on Linux
+    result['peak_rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="random self play through make_move for both sides")
+    parser.add_argument('--plies', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=327)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--board', metavar='FILE', help="start from the first readBoard of a command file")
+    parser.add_argument('--trace-plies', type=int, default=5000, help="plies run again under tracemalloc")
+    parser.add_argument('--max-game', type=int, default=200, help="plies before a game is restarted")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per engine, plies/s is their median")
+    args = parser.parse_args(argv)
+
+    board_text = first_board_text(args.board) if args.board else START_POSITION
+    print("{} plies, seed {}, median plies/s of {} runs".format(args.plies, args.seed, args.repeat))
+    print("{:<10} {:>10} {:>7} {:>14} {:>14} {:>10} {:>10}".format(
+        'engine', 'plies/s', 'games', 'temp B/ply', 'kept B/ply', 'RSS MiB', 'checksum'))
+    # the engines take turns, one worker process per run, and the order rotates every round, so a slow
+    # stretch on the machine or the slot right after another worker exits is not always the same engine's
+    runs = {engine: [] for engine in args.engines}
+    for round_number in range(args.repeat):
+        shift = round_number % len(args.engines)
+        for engine in args.engines[shift:] + args.engines[:shift]:
+            with ProcessPoolExecutor(1) as pool:
+                runs[engine].append(pool.submit(measure, engine, board_text, args.plies, args.seed,
+                                                min(args.trace_plies, args.plies), args.max_game).result())
+    results = []
+    for engine in args.engines:
+        result = dict(runs[engine][-1])
+        result['plies_per_s'] = statistics.median(run['plies_per_s'] for run in runs[engine])
+        results.append(result)
+        print("{engine:<10} {plies_per_s:>10.0f} {games:>7} {transient_bytes_per_ply:>14.0f} "
+              "{retained_bytes_per_ply:>14.1f} {:>10.1f} {checksum:>10x}".format(result['peak_rss_kib'] / 1024, **result))
+    if len({result['checksum'] for result in results}) > 1:
+        print("engines played different games, their move generation disagrees")
+    return results
+
+
+if __name__ == '__main__':
+    main()
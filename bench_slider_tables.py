@@ -0,0 +1,89 @@
+# benchmark for sliding piece moves from the line tables against search_direction and the ray masks
+# Dane Iwema
+# IT327
+
+from bench_board_memory import random_board_text
+from board_loader import parse_board
+from move_tables import SLIDER_DIRECTIONS
+import argparse
+import random
+import time
+import tracemalloc
+
+SLIDER_LABELS = tuple(SLIDER_DIRECTIONS)
+
+
+def table_build_cost():
+    """builds the line tables again, returning (seconds, traced bytes kept, number of entries)"""
+    from slider_tables import build_slider_tables
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables = build_slider_tables()
+    elapsed = time.perf_counter() - start
+    kept = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    entries = sum(len(table) for lines in tables for _, table in lines)
+    return elapsed, kept, entries
+
+
+def sliders(board):
+    """returns every sliding piece on a board"""
+    found = []
+    for row in range(8):
+        for col in range(8):
+            piece = board.get_piece(row, col)
+            if piece is not None and piece.get_label().value in SLIDER_LABELS:
+                found.append(piece)
+    return found
+
+
+def search_direction_moves(piece, board):
+    moves = set()
+    for direction in SLIDER_DIRECTIONS[piece.get_label().value]:
+        moves.update(piece.search_direction(direction, board))
+    return moves
+
+
+def bitboard_moves(piece, board):
+    return piece.attacks()
+
+
+def time_per_slider(boards, method, repeat):
+    """seconds per slider for method(piece, board) over every slider of every board"""
+    pieces = [(piece, board) for board in boards for piece in sliders(board)]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for piece, board in pieces:
+            method(piece, board)
+    return (time.perf_counter() - start) / (repeat * len(pieces)), len(pieces)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="sliding piece move generation from the line tables")
+    parser.add_argument('--boards', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=327)
+    args = parser.parse_args(argv)
+
+    elapsed, kept, entries = table_build_cost()
+    print("line tables: {} entries, built in {:.1f} ms, {:.2f} MiB".format(entries, elapsed * 1000, kept / 2 ** 20))
+
+    print("{:<8} {:>8} {:>16} {:>12} {:>12} {:>8}".format(
+        'board', 'sliders', 'search_direction', 'ray masks', 'tables', 'same'))
+    for name, pieces in (('sparse', 6), ('dense', 40)):
+        rng = random.Random(args.seed)
+        texts = [random_board_text(rng, pieces) for _ in range(args.boards)]
+        engines = {engine: [parse_board(text.split('\n'), engine) for text in texts]
+                   for engine in ('classic', 'bitboard', 'lookup')}
+        search, count = time_per_slider(engines['classic'], search_direction_moves, args.repeat)
+        rays, _ = time_per_slider(engines['bitboard'], bitboard_moves, args.repeat)
+        tables, _ = time_per_slider(engines['lookup'], bitboard_moves, args.repeat)
+        same = all(sorted(piece.get_legal_moves(board)) == sorted(search_direction_moves(classic, classic_board))
+                   for board, classic_board in zip(engines['lookup'], engines['classic'])
+                   for piece, classic in zip(sliders(board), sliders(classic_board)))
+        print("{:<8} {:>8} {:>13.2f} us {:>9.2f} us {:>9.2f} us {:>8}".format(
+            name, count, search * 1e6, rays * 1e6, tables * 1e6, 'yes' if same else 'NO'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# benchmark for interpreter startup and import cost of the chess_move_checker command line program
+# Dane Iwema
+# IT327
+
+from bench_check_move import BASELINE_REVISION
+from bench_check_move import resolve_revision
+from bench_self_play import START_POSITION
+from chess_move_checker import ENGINES
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# a command file about as small as the ones the program is run on one at a time
+TINY_COMMANDS = ('readBoard\n' + START_POSITION + 'checkMove 0 1 2 2\nmakeMove 1 4 3 4\n'
+                 'genPossMoves 0 3\nwriteBoard\nquit\n')
+
+# the files of the original program, run from their own folder so they shadow the current ones
+BASELINE_FILES = ('chess_move_checker.py', 'chess_piece.py', 'my_pieces.py')
+
+
+def export_baseline(revision, folder):
+    """writes BASELINE_FILES as they were at revision into folder"""
+    for name in BASELINE_FILES:
+        source = subprocess.check_output(['git', 'show', revision + ':' + name], cwd=HERE)
+        with open(os.path.join(folder, name), 'wb') as outfile:
+            outfile.write(source)
+
+
+def child_env():
+    """returns the environment for the timed runs
+
+    The current folder goes after anything already on PYTHONPATH, so the baseline finds the modules it
+    shares with this one (board, chess_utils, mec_pieces) while its own copies come first. Bytecode is
+    written so every run after the first loads it the way an installed program does, instead of
+    compiling every module again.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [env.get('PYTHONPATH'), HERE]))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def import_micros(stderr):
+    """adds up the self times of every line python -X importtime wrote
+
+    Returns:
+        type: (total microseconds, list of (cumulative microseconds, module) for the top level imports)
+    """
+    total = 0
+    top = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total += int(self_us)
+        if not name.startswith('  '):
+            top.append((int(cumulative_us), name.strip()))
+    return total, top
+
+
+def run(args, cwd, env):
+    """runs the interpreter with args from cwd and returns (wall seconds, stderr)"""
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable] + args, cwd=cwd, env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, text=True, check=True)
+    return time.perf_counter() - start, done.stderr
+
+
+def measure(args, cwd, env, runs):
+    """returns (median import ms, median wall ms, top level imports of one run) for a command"""
+    run(args, cwd, env)
+    imports = [import_micros(run(['-X', 'importtime'] + args, cwd, env)[1]) for _ in range(runs)]
+    wall = [run(args, cwd, env)[0] for _ in range(runs)]
+    return (statistics.median(total for total, _ in imports) / 1000, statistics.median(wall) * 1000,
+            imports[0][1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="startup of one small chess_move_checker run against the original")
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--baseline', metavar='REV', default=BASELINE_REVISION,
+                        help="revision with the original program (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=8, help="slowest top level imports listed for the classic run")
+    args = parser.parse_args(argv)
+
+    try:
+        revision = resolve_revision(args.baseline)
+    except ValueError as error:
+        parser.error(str(error))
+    env = child_env()
+    with tempfile.TemporaryDirectory() as folder:
+        baseline_folder = os.path.join(folder, 'baseline')
+        os.mkdir(baseline_folder)
+        try:
+            export_baseline(revision, baseline_folder)
+        except subprocess.CalledProcessError:
+            parser.error("revision {} does not have {}".format(args.baseline, ', '.join(BASELINE_FILES)))
+        infilename = os.path.join(folder, 'tiny.txt')
+        outfilename = os.path.join(folder, 'tiny_out.txt')
+        with open(infilename, 'w') as infile:
+            infile.write(TINY_COMMANDS)
+
+        floor = statistics.median(run(['-c', 'pass'], folder, env)[0] for _ in range(args.runs)) * 1000
+        print("medians over {} runs, interpreter with no imports {:.1f} ms".format(args.runs, floor))
+        print("{:<20} {:>10} {:>10} {:>14}".format('program', 'import ms', 'run ms', 'above floor'))
+        rows = [('original ' + args.baseline, ['chess_move_checker.py', infilename, outfilename], baseline_folder)]
+        rows += [(engine, ['chess_move_checker.py', infilename, outfilename, engine], HERE) for engine in args.engines]
+        top = []
+        for name, command, cwd in rows:
+            import_ms, wall_ms, imports = measure(command, cwd, env, args.runs)
+            if cwd == HERE and not top:
+                top = imports
+            print("{:<20} {:>10.1f} {:>10.1f} {:>11.1f} ms".format(name, import_ms, wall_ms, wall_ms - floor))
+    print("slowest top level imports of the current " + args.engines[0] + " run")
+    for cumulative, name in sorted(top, reverse=True)[:args.top]:
+        print("    {:<24} {:>8.1f} ms".format(name, cumulative / 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# validates vector_moves against the piece classes on random boards and times both
+# Dane Iwema
+# IT327
+
+from board_loader import parse_board
+from position_corpus import CODE_LABELS
+from vector_moves import MASK_LABELS
+from vector_moves import batch_move_masks
+import argparse
+import numpy as np
+import time
+
+
+def random_codes(count, seed, pieces=16):
+    """builds (count, 8, 8) piece codes with up to `pieces` random pieces per board"""
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(1, len(CODE_LABELS), size=(count, 64), dtype=np.uint8)
+    codes[rng.random((count, 64)) > pieces / 64] = 0
+    return codes.reshape(count, 8, 8)
+
+
+def piece_masks(codes):
+    """computes the same masks as batch_move_masks one board and one piece at a time"""
+    masks = {label: np.zeros(codes.shape, dtype=bool) for label in MASK_LABELS}
+    for index in range(codes.shape[0]):
+        rows = [''.join(CODE_LABELS[code] for code in row) for row in codes[index]]
+        board = parse_board(rows)
+        for row in range(8):
+            for col in range(8):
+                label = rows[row][col]
+                if label in masks:
+                    for move_row, move_col in board.get_piece(row, col).get_legal_moves(board):
+                        masks[label][index, move_row, move_col] = True
+    return masks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="vectorized move masks cross checked against the piece classes")
+    parser.add_argument('boards', type=int, nargs='?', default=2000)
+    parser.add_argument('--seed', type=int, default=327)
+    args = parser.parse_args(argv)
+
+    count = args.boards
+    codes = random_codes(count, args.seed)
+    start = time.perf_counter()
+    vector = batch_move_masks(codes)
+    vector_time = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = piece_masks(codes)
+    piece_time = time.perf_counter() - start
+
+    for label in MASK_LABELS:
+        mismatches = int((vector[label] != expected[label]).any(axis=(1, 2)).sum())
+        print("{:<3} boards with mismatches: {}".format(label, mismatches))
+    print("{} boards: vectorized {:.0f} boards/s, pieces {:.0f} boards/s".format(
+        count, count / vector_time, count / piece_time))
+
+
+if __name__ == '__main__':
+    main()
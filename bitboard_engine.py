@@ -0,0 +1,425 @@
+# bitboard backed move generation for the pieces of both colors
+# Dane Iwema
+# IT327
+
+from chess_utils import BoardInfo
+from chess_utils import PieceInfo
+from mec_pieces import BlackPiece
+from mec_pieces import King
+from my_pieces import BlackPawn
+from my_pieces import Knight
+from my_pieces import Rook
+from my_pieces import WhitePawn
+from my_pieces import Bishop
+from my_pieces import Queen
+from move_tables import BLACK_PAWN_CAPTURES
+from move_tables import BOARD_SIZE
+from move_tables import KNIGHT_TARGETS
+from move_tables import PAWN_CAPTURES
+from move_tables import RAYS
+from move_tables import RAY_DIRECTION
+from move_tables import SLIDER_DIRECTIONS
+from move_tables import on_board
+from move_tables import square_index
+from piece_colors import BLACK
+from piece_colors import BlackPieceInfo
+from piece_colors import WHITE
+from piece_colors import black_constructor
+
+# directions whose squares have a larger index than the starting square, the first blocker
+# along these rays is the lowest set bit, for the others it is the highest set bit
+POSITIVE_DIRECTIONS = (1, 2, 5, 6)
+
+
+def _square_mask(squares):
+    """builds a bitboard with a bit set for every (row, col) in squares"""
+    mask = 0
+    for row, col in squares:
+        mask |= 1 << square_index(row, col)
+    return mask
+
+
+# bitboard versions of the move_tables entries, indexed by square
+KNIGHT_ATTACKS = [_square_mask(targets) for targets in KNIGHT_TARGETS]
+PAWN_CAPTURE_MASKS = [_square_mask(targets) for targets in PAWN_CAPTURES]
+BLACK_PAWN_CAPTURE_MASKS = [_square_mask(targets) for targets in BLACK_PAWN_CAPTURES]
+RAY_MASKS = [[_square_mask(RAYS[sq][direction]) for sq in range(64)] for direction in range(8)]
+
+
+def slider_attacks(square, directions, occupied):
+    """finds every square a sliding piece can reach, stopping on the first occupied square in each direction
+
+    Arguments:
+        square(Integer): the square index of the sliding piece
+        directions(iterable): the direction numbers 0-7 the piece can slide in
+        occupied(Integer): bitboard of every occupied square
+
+    Returns:
+        type: bitboard of the reachable squares including the first blocker in each direction
+    """
+    attacks = 0
+    for direction in directions:
+        ray = RAY_MASKS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            if direction in POSITIVE_DIRECTIONS:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= RAY_MASKS[direction][first]
+        attacks |= ray
+    return attacks
+
+
+class BitboardPosition():
+    """occupancy of a board stored as two 64 bit integers
+
+    Attribues:
+        white(Integer): bitboard of the squares holding white pieces
+        black(Integer): bitboard of the squares holding black pieces
+    """
+
+    def __init__(self):
+        """BitboardPosition initializer, starts as an empty board"""
+        self.white = 0
+        self.black = 0
+
+    @classmethod
+    def from_board(cls, board):
+        """builds the occupancy from any board using get_square_info
+
+        Arguments:
+            board(Board object): the board to read
+
+        Returns:
+            type: BitboardPosition
+        """
+        position = cls()
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                position.place(row, col, board.get_square_info(row, col))
+        return position
+
+    def place(self, row, col, color):
+        """marks a square as holding a piece of the given color
+
+        Arguments:
+            row(Integer): the row number
+            col(Integer): the column number
+            color(BoardInfo): BoardInfo.WHITE or BoardInfo.BLACK, anything else is ignored
+        """
+        bit = 1 << square_index(row, col)
+        if color == WHITE:
+            self.white |= bit
+        elif color == BLACK:
+            self.black |= bit
+
+    def move_piece(self, from_row, from_col, to_row, to_col):
+        """moves a piece, removing whatever was on the destination square
+
+        Arguments:
+            from_row(Integer): the starting row
+            from_col(Integer): the starting column
+            to_row(Integer): the destination row
+            to_col(Integer): the destination column
+        """
+        from_bit = 1 << square_index(from_row, from_col)
+        to_bit = 1 << square_index(to_row, to_col)
+        self.white &= ~to_bit
+        self.black &= ~to_bit
+        if self.white & from_bit:
+            self.white ^= from_bit | to_bit
+        elif self.black & from_bit:
+            self.black ^= from_bit | to_bit
+
+    def occupied(self):
+        """returns the bitboard of every occupied square"""
+        return self.white | self.black
+
+    def empty(self):
+        """returns the bitboard of every empty square"""
+        return ~(self.white | self.black) & 0xFFFFFFFFFFFFFFFF
+
+
+class BitboardPiece():
+    """mixin that moves a piece's move logic onto a shared BitboardPosition
+
+    Child classes must also inherit from a ChessPiece subclass, define attacks() and
+    declare the _position slot themselves since two slotted bases cannot be combined
+    """
+
+    __slots__ = ()
+
+    def bind(self, position):
+        """connects the piece to the position it lives on and marks its square
+
+        Arguments:
+            position(BitboardPosition): the occupancy shared by every piece on the board
+
+        Returns:
+            type: the piece itself
+        """
+        self._position = position
+        position.place(self._row, self._col, self._color)
+        return self
+
+    def move(self, new_row, new_col):
+        """Sets the piece's new location and keeps the bitboards in sync
+
+        Arguments:
+            new_row(Integer): the new row number to move to
+            new_col(Integer): the new column number to move to
+        """
+        self._position.move_piece(self._row, self._col, new_row, new_col)
+        super().move(new_row, new_col)
+
+    def attacks(self):
+        """returns the bitboard of the squares this piece can move to"""
+        return 0
+
+    def own_pieces(self):
+        """returns the bitboard of the squares holding pieces of this piece's color"""
+        return self._position.white if self._color == WHITE else self._position.black
+
+    def is_legal_move(self, dest_row, dest_col, board):
+        """Returns true if the destination bit is set in the piece's move bitboard
+
+        Attribues:
+            dest_row(Integer): the destination row to move the piece
+            dest_col(Integer): the destination column to move the piece
+            board(Board object): unused, the occupancy comes from the bound position
+
+        Returns:
+            type: boolean
+        """
+        if not on_board(dest_row, dest_col):
+            return False
+        return bool(self.attacks() >> square_index(dest_row, dest_col) & 1)
+
+    def iter_legal_moves(self, board):
+        """yields every square in the piece's move bitboard as a (row, col) tuple"""
+        moves = self.attacks()
+        while moves:
+            low_bit = moves & -moves
+            yield divmod(low_bit.bit_length() - 1, BOARD_SIZE)
+            moves ^= low_bit
+
+    def get_legal_moves(self, board):
+        """returns every square in the piece's move bitboard as a set of (row, col) tuples"""
+        pos_moves = set()
+        moves = self.attacks()
+        while moves:
+            low_bit = moves & -moves
+            pos_moves.add(divmod(low_bit.bit_length() - 1, BOARD_SIZE))
+            moves ^= low_bit
+        return pos_moves
+
+    def generate_legal_moves(self, board_data, board):
+        """Writes the piece's label on its square and every square in its move bitboard
+
+        Attribues:
+            board_data(Board object): an empty board
+            board(Board object): unused, the occupancy comes from the bound position
+
+        Returns:
+            type: the passed in board_data filled with all the possible moves of this piece
+        """
+        char_label = self._char
+        board_data[self._row][self._col] = char_label
+        moves = self.attacks()
+        while moves:
+            low_bit = moves & -moves
+            square = low_bit.bit_length() - 1
+            board_data[square // BOARD_SIZE][square % BOARD_SIZE] = char_label
+            moves ^= low_bit
+        return board_data
+
+
+class BitboardKnight(BitboardPiece, Knight):
+    """Knight whose moves come from the precomputed knight attack table"""
+
+    __slots__ = ('_position',)
+
+    def attacks(self):
+        return KNIGHT_ATTACKS[square_index(self._row, self._col)] & ~self.own_pieces()
+
+    def is_legal_move(self, dest_row, dest_col, board):
+        if not on_board(dest_row, dest_col):
+            return False
+        dest_bit = 1 << square_index(dest_row, dest_col)
+        return bool(KNIGHT_ATTACKS[square_index(self._row, self._col)] & dest_bit) and not self.own_pieces() & dest_bit
+
+
+class BitboardWhitePawn(BitboardPiece, WhitePawn):
+    """WhitePawn whose moves come from the precomputed pawn capture table and the empty squares"""
+
+    __slots__ = ('_position',)
+
+    def attacks(self):
+        square = square_index(self._row, self._col)
+        empty = self._position.empty()
+        moves = PAWN_CAPTURE_MASKS[square] & self._position.black
+        if square + BOARD_SIZE < 64:
+            push = (1 << (square + BOARD_SIZE)) & empty
+            moves |= push
+            # the double push needs both squares in front of the pawn to be empty
+            if push and self._row == 1:
+                moves |= (1 << (square + 2 * BOARD_SIZE)) & empty
+        return moves
+
+
+class BitboardBlackPawn(BitboardPiece, BlackPawn):
+    """BlackPawn whose moves come from the precomputed black pawn capture table and the empty squares"""
+
+    __slots__ = ('_position',)
+
+    def attacks(self):
+        square = square_index(self._row, self._col)
+        empty = self._position.empty()
+        moves = BLACK_PAWN_CAPTURE_MASKS[square] & self._position.white
+        if square >= BOARD_SIZE:
+            push = (1 << (square - BOARD_SIZE)) & empty
+            moves |= push
+            # the double push needs both squares in front of the pawn to be empty
+            if push and self._row == BOARD_SIZE - 2:
+                moves |= (1 << (square - 2 * BOARD_SIZE)) & empty
+        return moves
+
+
+class BitboardSlider(BitboardPiece):
+    """shared attacks() for the Queen, Bishop, and Rook"""
+
+    __slots__ = ()
+
+    def attacks(self):
+        directions = SLIDER_DIRECTIONS[self._char]
+        square = square_index(self._row, self._col)
+        return slider_attacks(square, directions, self._position.occupied()) & ~self.own_pieces()
+
+    def is_legal_move(self, dest_row, dest_col, board):
+        """Returns true if the destination is on one of the piece's rays with nothing in between
+
+        Only the one ray is tested, attacks() builds every ray and is kept for whole board generation.
+
+        Attribues:
+            dest_row(Integer): the destination row to move the piece
+            dest_col(Integer): the destination column to move the piece
+            board(Board object): unused, the occupancy comes from the bound position
+
+        Returns:
+            type: boolean
+        """
+        if not on_board(dest_row, dest_col):
+            return False
+        square = square_index(self._row, self._col)
+        dest = square_index(dest_row, dest_col)
+        direction = RAY_DIRECTION[square][dest]
+        if direction not in SLIDER_DIRECTIONS[self._char]:
+            return False
+        # the ray from the destination on is part of the ray from the piece, what is left is the
+        # destination and the squares between the two
+        dest_bit = 1 << dest
+        between = RAY_MASKS[direction][square] ^ RAY_MASKS[direction][dest] ^ dest_bit
+        if between & self._position.occupied():
+            return False
+        return not self.own_pieces() & dest_bit
+
+
+class BitboardRook(BitboardSlider, Rook):
+    """Rook using bitboard ray masks"""
+
+    __slots__ = ('_position',)
+
+
+class BitboardBishop(BitboardSlider, Bishop):
+    """Bishop using bitboard ray masks"""
+
+    __slots__ = ('_position',)
+
+
+class BitboardQueen(BitboardSlider, Queen):
+    """Queen using bitboard ray masks"""
+
+    __slots__ = ('_position',)
+
+
+class BitboardKing(BitboardPiece, King):
+    """King that keeps using its own move logic but keeps the bitboards in sync when it moves"""
+
+    __slots__ = ('_position',)
+
+    def is_legal_move(self, dest_row, dest_col, board):
+        return King.is_legal_move(self, dest_row, dest_col, board)
+
+    def generate_legal_moves(self, board_data, board):
+        return King.generate_legal_moves(self, board_data, board)
+
+    def get_legal_moves(self, board):
+        return King.get_legal_moves(self, board)
+
+    def iter_legal_moves(self, board):
+        return King.iter_legal_moves(self, board)
+
+
+class BitboardBlackPiece(BitboardPiece, BlackPiece):
+    """BlackPiece that keeps the bitboards in sync when it moves"""
+
+    __slots__ = ('_position',)
+
+    def is_legal_move(self, dest_row, dest_col, board):
+        return BlackPiece.is_legal_move(self, dest_row, dest_col, board)
+
+    def generate_legal_moves(self, board_data, board):
+        return BlackPiece.generate_legal_moves(self, board_data, board)
+
+    def get_legal_moves(self, board):
+        return BlackPiece.get_legal_moves(self, board)
+
+    def iter_legal_moves(self, board):
+        return BlackPiece.iter_legal_moves(self, board)
+
+
+def _bitboard_king(row, column):
+    """creates a white BitboardKing, the King constructor also takes its color and label"""
+    return BitboardKing(row, column, BoardInfo.WHITE, PieceInfo.WHITE_KING)
+
+
+def _black_bitboard_king(row, column):
+    """creates a black BitboardKing"""
+    return BitboardKing(row, column, BoardInfo.BLACK, BlackPieceInfo.BLACK_KING)
+
+
+# maps each label to the constructor for its bitboard piece
+BITBOARD_CONSTRUCTORS = {
+    PieceInfo.BLACK.value: BitboardBlackPiece,
+    PieceInfo.WHITE_KING.value: _bitboard_king,
+    PieceInfo.WHITE_KNIGHT.value: BitboardKnight,
+    PieceInfo.WHITE_ROOK.value: BitboardRook,
+    PieceInfo.WHITE_BISHOP.value: BitboardBishop,
+    PieceInfo.WHITE_PAWN.value: BitboardWhitePawn,
+    PieceInfo.WHITE_QUEEN.value: BitboardQueen,
+    BlackPieceInfo.BLACK_KING.value: _black_bitboard_king,
+    BlackPieceInfo.BLACK_KNIGHT.value: black_constructor(BitboardKnight),
+    BlackPieceInfo.BLACK_ROOK.value: black_constructor(BitboardRook),
+    BlackPieceInfo.BLACK_BISHOP.value: black_constructor(BitboardBishop),
+    BlackPieceInfo.BLACK_PAWN.value: BitboardBlackPawn,
+    BlackPieceInfo.BLACK_QUEEN.value: black_constructor(BitboardQueen),
+}
+
+
+def make_bitboard_piece(row, column, label, position):
+    """create a bitboard piece given a location and label, bound to the given position
+
+    Arguments:
+        row(Integer): the row number
+        column(Integer): the column number
+        label(string): the one character label read from the input file
+        position(BitboardPosition): the occupancy shared by every piece on this board
+
+    Returns:
+        type: the piece or None for an empty square
+    """
+    constructor = BITBOARD_CONSTRUCTORS.get(label)
+    if constructor is None:
+        return None
+    return constructor(row, column).bind(position)
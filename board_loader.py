@@ -0,0 +1,149 @@
+# table driven board parsing for single boards and files of many boards
+# Dane Iwema
+# IT327
+
+from board import Board
+from chess_utils import BoardInfo
+from chess_utils import PieceInfo
+from fast_board import FastBoard
+from mec_pieces import BlackPiece
+from mec_pieces import King
+from my_pieces import BlackPawn
+from my_pieces import Knight
+from my_pieces import Rook
+from my_pieces import WhitePawn
+from my_pieces import Bishop
+from my_pieces import Queen
+from piece_colors import BlackPieceInfo
+from piece_colors import black_constructor
+
+
+def _white_king(row, column):
+    """creates a white King, the King constructor also takes its color and label"""
+    return King(row, column, BoardInfo.WHITE, PieceInfo.WHITE_KING)
+
+
+def _black_king(row, column):
+    """creates a black King"""
+    return King(row, column, BoardInfo.BLACK, BlackPieceInfo.BLACK_KING)
+
+
+# maps each label to its piece constructor so a square is one dictionary lookup
+# instead of a chain of PieceInfo comparisons
+PIECE_CONSTRUCTORS = {
+    PieceInfo.BLACK.value: BlackPiece,
+    PieceInfo.WHITE_KING.value: _white_king,
+    PieceInfo.WHITE_KNIGHT.value: Knight,
+    PieceInfo.WHITE_ROOK.value: Rook,
+    PieceInfo.WHITE_BISHOP.value: Bishop,
+    PieceInfo.WHITE_PAWN.value: WhitePawn,
+    PieceInfo.WHITE_QUEEN.value: Queen,
+    BlackPieceInfo.BLACK_KING.value: _black_king,
+    BlackPieceInfo.BLACK_KNIGHT.value: black_constructor(Knight),
+    BlackPieceInfo.BLACK_ROOK.value: black_constructor(Rook),
+    BlackPieceInfo.BLACK_BISHOP.value: black_constructor(Bishop),
+    BlackPieceInfo.BLACK_PAWN.value: BlackPawn,
+    BlackPieceInfo.BLACK_QUEEN.value: black_constructor(Queen),
+}
+
+# the shared pieces for the flyweight engine, one per label
+FLYWEIGHTS = {label: constructor(0, 0) for label, constructor in PIECE_CONSTRUCTORS.items()}
+
+
+def parse_board(rows, engine='classic'):
+    """builds a board from its 8 text rows
+
+    Arguments:
+        rows(list): the 8 lines of a readBoard block, line endings are ignored
+        engine(string): one of chess_move_checker.ENGINES
+
+    Returns:
+        type: FastBoard (FlyweightBoard or SparseBoard for those engines)
+    """
+    # the other engines' modules are imported the first time a board is built with them,
+    # so a classic run never loads them
+    size = Board.BOARD_SIZE
+    if engine == 'sparse':
+        from sparse_board import SparseBoard
+        # only occupied squares are recorded, the pieces are built when a command touches them
+        board = SparseBoard(PIECE_CONSTRUCTORS)
+        for row in range(size):
+            line = rows[row]
+            for col in range(size):
+                if line[col] in PIECE_CONSTRUCTORS:
+                    board.place_label(row, col, line[col])
+        return board
+
+    if engine == 'flyweight':
+        from flyweight_board import FlyweightBoard
+        board = FlyweightBoard()
+        for row in range(size):
+            line = rows[row]
+            for col in range(size):
+                board.add_piece(row, col, FLYWEIGHTS.get(line[col]))
+        return board
+
+    board = FastBoard()
+    position = None
+    table = PIECE_CONSTRUCTORS
+    if engine == 'bitboard':
+        from bitboard_engine import BITBOARD_CONSTRUCTORS
+        from bitboard_engine import BitboardPosition
+        position = BitboardPosition()
+        table = BITBOARD_CONSTRUCTORS
+    elif engine == 'lookup':
+        from bitboard_engine import BitboardPosition
+        from slider_tables import LOOKUP_CONSTRUCTORS
+        position = BitboardPosition()
+        table = LOOKUP_CONSTRUCTORS
+    for row in range(size):
+        line = rows[row]
+        for col in range(size):
+            constructor = table.get(line[col])
+            piece = None
+            if constructor is not None:
+                piece = constructor(row, col)
+                if position is not None:
+                    piece.bind(position)
+            board.add_piece(row, col, piece)
+    return board
+
+
+def is_read_board(line):
+    """returns True for a readBoard command line, with or without a board id after it"""
+    words = line.split()
+    return bool(words) and words[0] == 'readBoard'
+
+
+def read_board(infile, engine='classic'):
+    """reads the next 8 lines of an open command file as a board"""
+    return parse_board([infile.readline() for _ in range(Board.BOARD_SIZE)], engine)
+
+
+def iter_boards(infile, engine='classic'):
+    """parses a file of concatenated boards in one read, yielding each board as it is built
+
+    The boards may be bare 8 line blocks or readBoard blocks, readBoard lines (with or without an id)
+    and blank lines are skipped.
+
+    Arguments:
+        infile(file): the open file of boards
+        engine(string): one of chess_move_checker.ENGINES
+
+    Returns:
+        type: generator of boards
+    """
+    rows = []
+    for line in infile.read().split('\n'):
+        if line == '' or is_read_board(line):
+            continue
+        rows.append(line)
+        if len(rows) == Board.BOARD_SIZE:
+            yield parse_board(rows, engine)
+            rows = []
+
+
+def load_boards(filename, engine='classic'):
+    """returns every board in a file of concatenated boards as a list"""
+    with open(filename, 'r') as infile:
+        return list(iter_boards(infile, engine))
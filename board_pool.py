@@ -0,0 +1,65 @@
+# named boards kept between commands so a command file can switch positions without reparsing
+# Dane Iwema
+# IT327
+
+from collections import OrderedDict
+
+# boards kept before the least recently used one is dropped
+DEFAULT_POOL_SIZE = 64
+
+
+class BoardPool():
+    """least recently used pool of boards loaded with readBoard <id>
+
+    Attribues:
+        max_boards(Integer): the most boards kept before evicting
+        hits(Integer): lookups that found their board
+        misses(Integer): lookups for an id that was never loaded or has been evicted
+        evictions(Integer): boards dropped to stay under max_boards
+        _boards(OrderedDict): id to board, least recently used first
+    """
+
+    def __init__(self, max_boards=DEFAULT_POOL_SIZE):
+        """BoardPool initializer
+
+        Arguments:
+            max_boards(Integer): the most boards kept before evicting
+        """
+        self.max_boards = max_boards
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._boards = OrderedDict()
+
+    def __len__(self):
+        return len(self._boards)
+
+    def __contains__(self, board_id):
+        return board_id in self._boards
+
+    def get(self, board_id):
+        """returns the board loaded under board_id and marks it most recently used, None if there is none"""
+        board = self._boards.get(board_id)
+        if board is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._boards.move_to_end(board_id)
+        return board
+
+    def put(self, board_id, board):
+        """keeps a board under board_id, replacing any board already loaded under it
+
+        Arguments:
+            board_id(string): the id the board was loaded under
+            board(FastBoard): the board
+        """
+        self._boards.pop(board_id, None)
+        self._boards[board_id] = board
+        while len(self._boards) > self.max_boards:
+            self._boards.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """returns the counters and current size as a dictionary"""
+        return {'boards': len(self._boards), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
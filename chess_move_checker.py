@@ -2,119 +2,388 @@
 # Mary Elaine Califf
 # 10/22/2021
 
-from board import Board
 from chess_utils import BoardInfo
-from chess_utils import PieceInfo
-from chess_piece import ChessPiece
-from mec_pieces import BlackPiece
-from mec_pieces import King
-from my_pieces import Knight
-from my_pieces import Rook
-from my_pieces import WhitePawn
-from my_pieces import Bishop
-from my_pieces import Queen
+from output_writer import BufferedOutput
 import sys
+import time
+
+# the move generation engines that can be chosen at startup, flyweight uses the classic
+# pieces but shares one piece object per type across every board, sparse only records the occupied
+# squares and builds each piece the first time a command touches it, lookup is bitboard with the
+# sliding pieces read from occupancy indexed line tables. The tables take about 85 ms to build on the
+# first lookup board, and since slider moves are a small part of a ply, lookup plays about as fast as
+# bitboard end to end, its gain shows in bench_slider_tables rather than bench_self_play
+ENGINES = ('classic', 'bitboard', 'flyweight', 'sparse', 'lookup')
+
+# commands whose latency is also broken down by the piece on their starting square
+PIECE_COMMANDS = ('checkMove', 'makeMove', 'genPossMoves')
 
 
 def make_piece(row, column, label):
-    """create a piece given a location and label"""
-    if label == PieceInfo.BLACK.value:
-        return BlackPiece(row, column)
-    elif label == PieceInfo.WHITE_KING.value:
-        return King(row, column, BoardInfo.WHITE, PieceInfo(label))
-    # create comparable entries for each piece as you create it
-    elif label == PieceInfo.WHITE_KNIGHT.value:
-        return Knight(row, column)
-    elif label == PieceInfo.WHITE_ROOK.value:
-        return Rook(row, column)
-    elif label == PieceInfo.WHITE_BISHOP.value:
-        return Bishop(row, column)
-    elif label == PieceInfo.WHITE_PAWN.value:
-        return WhitePawn(row, column)
-    elif label == PieceInfo.WHITE_QUEEN.value:
-        return Queen(row, column)
-    else:
+    """create a piece given a location and label, None for an empty square or an unknown label
+
+    Both colors come from the board_loader constructor table, black pieces use the lower case labels
+    """
+    import board_loader
+    constructor = board_loader.PIECE_CONSTRUCTORS.get(label)
+    if constructor is None:
         return None
+    return constructor(row, column)
+
+
+def read_board(infile, engine='classic'):
+    # board_loader pulls in every piece module, so it waits for the first readBoard
+    import board_loader
+    return board_loader.read_board(infile, engine)
 
 
-def read_board(infile):
-    board = Board()
-    for row in range(Board.BOARD_SIZE):
-        line = infile.readline()
-        for col in range(Board.BOARD_SIZE):
-            board.add_piece(row, col, make_piece(row, col, line[col]))
-    return board
+# result line templates, each filled in with the move's four coordinates
+MOVED = "Moved from ({},{}) to ({},{})\n"
+CAN_MOVE = "Can move from ({},{}) to ({},{})\n"
+NOT_POSSIBLE = "Move from ({},{}) to ({},{}) is not possible\n"
+TOOK_BACK = "Took back move from ({},{}) to ({},{})\n"
+NEW_BOARD_STATE = "New board state: \n"
+NO_BOARD = "Error: no board named {}\n"
 
 
-def handle_move(locs, board, outfile, moving):
-    """handle move commands"""
+def handle_move(locs, board, outfile, moving, delta=False):
+    """handle move commands, with delta only the move is written after a makeMove instead of the whole board
+
+    Returns:
+        type: boolean, True if the move was possible
+    """
     from_row = int(locs[0])
     from_col = int(locs[1])
     to_row = int(locs[2])
     to_col = int(locs[3])
 
-    succeeded = False
     if (moving):
         succeeded = board.make_move(from_row, from_col, to_row, to_col)
         if succeeded:
-            outfile.write("Moved from ("+locs[0]+","+locs[1] +
-                          ") to ("+locs[2]+","+locs[3]+")\n")
-            outfile.write("New board state: \n")
-            board.write_to_file(outfile)
+            outfile.write(MOVED.format(*locs[:4]))
+            if not delta:
+                outfile.write(NEW_BOARD_STATE)
+                board.write_to_file(outfile)
     else:
         succeeded = board.check_move(from_row, from_col, to_row, to_col)
         if succeeded:
-            outfile.write("Can move from ("+locs[0]+","+locs[1] +
-                          ") to ("+locs[2]+","+locs[3]+")\n")
+            outfile.write(CAN_MOVE.format(*locs[:4]))
     if not succeeded:
-        outfile.write("Move from ("+locs[0]+","+locs[1] +
-                      ") to ("+locs[2]+","+locs[3]+") is not possible\n")
+        outfile.write(NOT_POSSIBLE.format(*locs[:4]))
+    return succeeded
+
+
+def handle_unmake_move(board, outfile, delta=False):
+    """handle unmakeMove commands, taking back the last move made on the board
 
+    Returns:
+        type: the (from_row, from_col, to_row, to_col) taken back, None if there was no move
+    """
+    move = board.unmake_move()
+    if move is None:
+        outfile.write("No move to take back\n")
+        return None
+    outfile.write(TOOK_BACK.format(*move))
+    if not delta:
+        outfile.write(NEW_BOARD_STATE)
+        board.write_to_file(outfile)
+    return move
 
-def display_possible_moves(loc, board, outfile):
+
+def handle_check_moves(locs, board, outfile):
+    """handle checkMoves commands, every 4 numbers are one move and all of them are checked in one batch
+
+    Returns:
+        type: bytearray of 1 for every possible move and 0 for the others
+    """
+    moves = []
+    for index in range(0, len(locs) - 3, 4):
+        moves.append((int(locs[index]), int(locs[index+1]), int(locs[index+2]), int(locs[index+3])))
+    results = board.check_moves(moves)
+
+    lines = []
+    for index, succeeded in enumerate(results):
+        template = CAN_MOVE if succeeded else NOT_POSSIBLE
+        lines.append(template.format(*locs[4*index:4*index+4]))
+    outfile.write(''.join(lines))
+    return results
+
+
+def display_possible_moves(loc, board, outfile, legal_only=False):
+    """handle genPossMoves commands, with legal_only moves that leave the king in check are left out"""
     row = int(loc[0])
     col = int(loc[1])
 
     outfile.write("Possible moves from ("+loc[0]+","+loc[1] + ")\n")
-    board.display_possible_moves(row, col, outfile)
+    if legal_only:
+        board.display_legal_moves(row, col, outfile)
+    else:
+        board.display_possible_moves(row, col, outfile)
     outfile.write('\n')
 
 
-# program start here
-# get the file names from the command line
-if len(sys.argv) < 3:
-    print("correct usage: "+sys.argv[0]+"inputfilename outputfilename")
-    sys.exit(1)
+def handle_in_check(board, outfile):
+    """handle inCheck commands
 
-infilename = sys.argv[1]
-outfilename = sys.argv[2]
+    Returns:
+        type: boolean, True if the white king is in check
+    """
+    in_check = board.is_in_check(BoardInfo.WHITE)
+    outfile.write("White is in check\n" if in_check else "White is not in check\n")
+    return in_check
 
-# since we're just processing an input file to produce an output file
-# go ahead and set those up
-infile = open(infilename, 'r')
-outfile = open(outfilename, 'w')
 
-board = None
-processing = True
+def handle_who_can_reach(loc, board, outfile):
+    """handle whoCanReach commands, lists the white pieces that can move to a square
 
-while processing:
-    # read a command
-    command = infile.readline().strip()
-    if command == 'readBoard':
-        board = read_board(infile)
-    elif command == 'writeBoard':
-        board.write_to_file(outfile)
-    elif command == 'quit':
-        processing = False
+    Returns:
+        type: list of the (row, col) squares of those pieces
+    """
+    origins = board.who_can_reach(int(loc[0]), int(loc[1]), BoardInfo.WHITE)
+    if origins:
+        outfile.write("Pieces that can reach (" + loc[0] + "," + loc[1] + "): " +
+                      ' '.join("({},{})".format(row, col) for row, col in origins) + "\n")
     else:
-        args = command.split()
-        print(args)
-        if args[0] == 'checkMove':
-            handle_move(args[1:], board, outfile, False)
-        elif args[0] == 'makeMove':
-            handle_move(args[1:], board, outfile, True)
-        elif args[0] == 'genPossMoves':
-            display_possible_moves(args[1:], board, outfile)
-
-infile.close()
-outfile.close()
+        outfile.write("No pieces can reach (" + loc[0] + "," + loc[1] + ")\n")
+    return origins
+
+
+def result_record(args, result, board, legal_only=False):
+    """builds the JSON Lines record for a command
+
+    Arguments:
+        args(list): the command split into words
+        result(object): what the command's handler returned
+        board(Board): the board after the command ran
+        legal_only(boolean): genPossMoves records leave out moves into self check, matching the text output
+
+    Returns:
+        type: dictionary
+    """
+    record = {'cmd': args[0], 'args': [int(arg) for arg in args[1:]]}
+    if args[0] in ('checkMove', 'makeMove', 'inCheck'):
+        record['ok'] = bool(result)
+    elif args[0] == 'checkMoves':
+        record['ok'] = list(result)
+    elif args[0] == 'unmakeMove':
+        record['ok'] = result is not None
+    elif args[0] == 'genPossMoves':
+        row, col = int(args[1]), int(args[2])
+        if legal_only:
+            record['moves'] = sorted(board.get_legal_moves_excluding_check(row, col))
+        else:
+            record['moves'] = sorted(board.get_legal_moves(row, col))
+    elif args[0] == 'whoCanReach':
+        record['origins'] = [list(origin) for origin in result]
+    return record
+
+
+def piece_label_at(board, args):
+    """returns the label of the piece on the starting square named by a move command's arguments, None if empty"""
+    piece = board.get_piece(int(args[1]), int(args[2])) if board is not None and len(args) > 2 else None
+    return piece.get_label().value if piece is not None else None
+
+
+def named_board_pool(pool):
+    """returns pool, or a new pool of DEFAULT_POOL_SIZE boards when it is None
+
+    board_pool is only imported once a command names a board, files that never do skip it.
+    """
+    if pool is None:
+        from board_pool import BoardPool
+        pool = BoardPool()
+    return pool
+
+
+def process_commands(infile, outfile, engine='classic', verbose=False, delta=False, stats=None, records=None,
+                     legal_only=False, pool=None):
+    """runs every command in an open input file, writing the results to an open output file
+
+    readBoard <id> also keeps the board in the pool under id, useBoard <id> makes a pooled board the
+    current one again without reparsing it, and a command starting with @<id> runs against that
+    pooled board while the current board stays current.
+
+    Arguments:
+        infile(file): the command file opened for reading
+        outfile(file): the output file opened for writing, written in large blocks
+        engine(string): the move generation engine, one of ENGINES
+        verbose(boolean): print each command's arguments as it runs
+        delta(boolean): write only the move after makeMove and unmakeMove instead of the whole board
+        stats(CommandStats): records each command's latency when given, None skips all timing
+        records(file): an open file that gets one JSON line per move or genPossMoves command, None to skip
+        legal_only(boolean): genPossMoves leaves out moves that put the mover's own king in check
+        pool(BoardPool): the named boards, None to make a pool of DEFAULT_POOL_SIZE boards when one is first named
+
+    Returns:
+        type: the number of commands processed
+    """
+    output = BufferedOutput(outfile, records)
+    board = None
+    processing = True
+    commands = 0
+
+    # whatever was written before a command fails still reaches the output file
+    try:
+        while processing:
+            # read a command, the end of the file is treated as quit
+            line = infile.readline()
+            command = line.strip()
+            commands += 1
+            current = board
+            target_id = None
+            if command.startswith('@'):
+                target_id, _, command = command.partition(' ')
+                target_id = target_id[1:]
+                pool = named_board_pool(pool)
+                board = pool.get(target_id)
+                if board is None:
+                    output.write(NO_BOARD.format(target_id))
+                    board = current
+                    continue
+            if not command and line:
+                # a blank line, or an @<id> with nothing after it, is skipped and not counted
+                commands -= 1
+                board = current
+                continue
+            if stats is not None:
+                args = command.split()
+                label = piece_label_at(board, args) if args and args[0] in PIECE_COMMANDS else None
+                start = time.perf_counter()
+            name, _, board_id = command.partition(' ')
+            if name == 'readBoard':
+                board = current = read_board(infile, engine)
+                if board_id:
+                    pool = named_board_pool(pool)
+                    pool.put(board_id.strip(), board)
+            elif name == 'useBoard':
+                board_id = board_id.strip()
+                pool = named_board_pool(pool)
+                found = pool.get(board_id)
+                if found is None:
+                    output.write(NO_BOARD.format(board_id))
+                else:
+                    board = current = found
+            elif command == 'writeBoard':
+                board.write_to_file(output)
+            elif command == 'quit' or not line:
+                # the quit line, or the end of the file, ends the run and is not counted as a command
+                commands -= 1
+                processing = False
+            else:
+                args = command.split()
+                if verbose:
+                    print(args)
+                result = None
+                if args[0] == 'checkMove':
+                    result = handle_move(args[1:], board, output, False)
+                elif args[0] == 'checkMoves':
+                    result = handle_check_moves(args[1:], board, output)
+                elif args[0] == 'makeMove':
+                    result = handle_move(args[1:], board, output, True, delta)
+                elif args[0] == 'unmakeMove':
+                    result = handle_unmake_move(board, output, delta)
+                elif args[0] == 'genPossMoves':
+                    display_possible_moves(args[1:], board, output, legal_only)
+                elif args[0] == 'inCheck':
+                    result = handle_in_check(board, output)
+                elif args[0] == 'whoCanReach':
+                    result = handle_who_can_reach(args[1:], board, output)
+                if output.wants_records():
+                    record = result_record(args, result, board, legal_only)
+                    if target_id is not None:
+                        record['board'] = target_id
+                    output.record(record)
+            if stats is not None and processing:
+                stats.record(command.split(' ', 1)[0], time.perf_counter() - start, label)
+            board = current
+    finally:
+        output.flush()
+    return commands
+
+
+def process_file(infilename, outfilename, engine='classic', verbose=False, delta=False, stats=None,
+                 jsonlfilename=None, legal_only=False, pool=None):
+    """processes one input file into one output file, and a JSON Lines file when jsonlfilename is given
+
+    Returns:
+        type: the number of commands processed
+    """
+    # since we're just processing an input file to produce an output file
+    # go ahead and set those up
+    with open(infilename, 'r') as infile, open(outfilename, 'w') as outfile:
+        if jsonlfilename is None:
+            return process_commands(infile, outfile, engine, verbose, delta, stats, None, legal_only, pool)
+        with open(jsonlfilename, 'w') as records:
+            return process_commands(infile, outfile, engine, verbose, delta, stats, records, legal_only, pool)
+
+
+def main(argv=None):
+    """program start here, get the file names from the command line"""
+    if argv is None:
+        argv = sys.argv[1:]
+    # the usual run, two file names and maybe an engine, goes straight to the file without
+    # importing argparse, which costs more than the rest of a small run's startup
+    options = [arg for arg in argv if arg.startswith('-')]
+    if not options and (len(argv) == 2 or len(argv) == 3 and argv[2] in ENGINES):
+        process_file(*argv)
+        return
+
+    import argparse
+    from board_pool import BoardPool
+    from board_pool import DEFAULT_POOL_SIZE
+    parser = argparse.ArgumentParser(description="check chess moves from a command file")
+    parser.add_argument('inputfilename')
+    parser.add_argument('outputfilename')
+    parser.add_argument('engine', nargs='?', choices=ENGINES, default='classic')
+    parser.add_argument('--delta', action='store_true', help="write only the move after makeMove, not the board")
+    parser.add_argument('--legal', action='store_true', help="genPossMoves leaves out moves into self check")
+    parser.add_argument('--verbose', action='store_true', help="print every command as it runs")
+    parser.add_argument('--stats', metavar='JSONFILE', help="write per command latency statistics to JSONFILE")
+    parser.add_argument('--jsonl', metavar='JSONLFILE', help="also write one JSON line per move or genPossMoves command to JSONLFILE")
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help="boards loaded with readBoard <id> kept before the least recently used is dropped")
+    parser.add_argument('--store', metavar='LOGFILE',
+                        help="reuse generated moves from earlier runs through the transposition store in LOGFILE")
+    parser.add_argument('--store-bytes', type=int, default=64 * 1024 * 1024,
+                        help="size the store's log is compacted at")
+    parser.add_argument('--profile', metavar='PROFFILE', help="run under cProfile and dump the profile to PROFFILE")
+    args = parser.parse_args(argv)
+
+    stats = None
+    if args.stats:
+        from command_stats import CommandStats
+        stats = CommandStats()
+    store = None
+    if args.store:
+        # every board's default move cache asks the store before generating anything
+        from move_cache import SHARED_MOVE_CACHE
+        from transposition_store import TranspositionStore
+        try:
+            store = TranspositionStore(args.store, args.store_bytes)
+        except ValueError as error:
+            parser.error(str(error))
+        SHARED_MOVE_CACHE.store = store
+    pool = BoardPool(args.pool_size)
+    run_args = (args.inputfilename, args.outputfilename, args.engine, args.verbose, args.delta, stats, args.jsonl,
+                args.legal, pool)
+    try:
+        if args.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.runcall(process_file, *run_args)
+            profiler.dump_stats(args.profile)
+        else:
+            process_file(*run_args)
+    finally:
+        if store is not None:
+            SHARED_MOVE_CACHE.store = None
+            store.close()
+    if stats is not None:
+        extra = {'pool': pool.stats()}
+        if store is not None:
+            extra['store'] = store.stats()
+        stats.write_json(args.stats, extra)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,16 @@
 # Dane Iwema
 # IT327
 
-from chess_utils import BoardInfo
 from chess_utils import PieceInfo
+from move_tables import BOARD_SIZE
+from move_tables import DIRECTION_NUMBERS
+from move_tables import RAYS
+from move_tables import RAY_DIRECTION
+from move_tables import SLIDER_DIRECTIONS
+from move_tables import on_board
+from move_tables import square_index
+from piece_colors import EMPTY
+from piece_colors import OPPONENT
 
 class ChessPiece():
     """Universal information and methods for every chess piece
@@ -13,8 +21,12 @@ class ChessPiece():
         _col(Integer): the column number
         _color(BoardInfo): a BoardInfo enumerator that represents Black or White
         _label(PieceInfo): a PieceInfo enumerator that represents the piece type
+        _char(string): the label's character, kept so move generation never goes back through the enum
+        _enemy(BoardInfo): the color this piece captures, None for a piece without a side
     """
 
+    __slots__ = ('_row', '_col', '_color', '_label', '_char', '_enemy')
+
     def __init__(self, c_row_num, c_col_num, c_color, c_label):
         """ChessPiece initializer
         
@@ -28,6 +40,8 @@ class ChessPiece():
         self._col = c_col_num
         self._color = c_color
         self._label = c_label
+        self._char = c_label.value
+        self._enemy = OPPONENT.get(c_color)
 
     def move(self, new_row, new_col):
         """Sets the Chess Piece's new location
@@ -55,6 +69,14 @@ class ChessPiece():
         """
         return self._label
 
+    def get_label_char(self):
+        """returns the character of the ChessPiece's label, the same as get_label().value
+
+        Returns:
+            type: the label's character
+        """
+        return self._char
+
     def is_legal_move(self, dest_row, dest_col, board):
         """definition for the is_legal_move function that each seperate piece
         will overrite
@@ -82,8 +104,50 @@ class ChessPiece():
         """
         return pos_moves
     
+    def iter_legal_moves(self, board):
+        """yields every square this piece can move to, pieces that only define generate_legal_moves
+        get their moves read back from one generated grid
+
+        Arguments:
+            board(Board object): the current locations of every piece on the board
+
+        Returns:
+            type: iterator of (row, col) tuples
+        """
+        board_data = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        self.generate_legal_moves(board_data, board)
+        return ((row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)
+                if board_data[row][col] is not None and (row != self._row or col != self._col))
+
+    def get_legal_moves(self, board):
+        """returns every square this piece can move to as a set
+
+        Arguments:
+            board(Board object): the current locations of every piece on the board
+
+        Returns:
+            type: a set of (row, col) tuples
+        """
+        return set(self.iter_legal_moves(board))
+
+    def fill_moves(self, board_data, pos_moves):
+        """writes the piece's label on its own square and on every square it can move to
+
+        Arguments:
+            board_data(Board object): an empty board
+            pos_moves(iterable): (row, col) tuples of the squares the piece can move to
+
+        Returns:
+            type: the passed in board_data
+        """
+        char_label = self._char
+        board_data[self._row][self._col] = char_label
+        for row, col in pos_moves:
+            board_data[row][col] = char_label
+        return board_data
+
     def check_take(self, square_type):
-        """Checks if a square is either empty or has a black piece, allowing a move there for pieces that can jump for the knight
+        """Checks if a square is either empty or has a piece of the other color, allowing a move there for pieces that can jump for the knight
         
         Arguments:
             square_type(BoardInfo enum): an enumerator from BoardInfo
@@ -91,7 +155,7 @@ class ChessPiece():
             Returns:
                 type: boolean
         """
-        if square_type == BoardInfo.EMPTY or square_type == BoardInfo.BLACK:
+        if square_type == EMPTY or square_type == self._enemy:
             return True
         return False
     
@@ -105,26 +169,18 @@ class ChessPiece():
             Returns:
                 type: a dictionary where the keys are tuples of all the possible moves and the values to the keys are all True
         """
-        # the 8 possible directions associated with the output from the determine_direction() method
-        directions = [[-1, 0], [0, 1], [1, 0], [0, -1], [-1, 1], [1, 1], [1, -1], [-1, -1]]
-
-        move_row = directions[direction][0] # finds the associated row movement from the given direction
-        move_col = directions[direction][1] # finds the associated column movement from the given direction
-        row = self._row
-        col = self._col
         pos_moves = {}
 
-        # while loop adding the move position to the current position and testing if the space can be moved to and adding the move as a key to the pos_moves dictionary with the value True
-        while (-1 < row < 8) and (-1 < col < 8):
-            row += move_row
-            col += move_col
+        # walks the precomputed ray adding each empty square as a key to the pos_moves dictionary with the value True
+        # until a piece of the other color (which can be taken) or one of the same color is reached
+        for row, col in RAYS[square_index(self._row, self._col)][direction]:
             square_info = board.get_square_info(row, col)
-            if  square_info == BoardInfo.EMPTY:
+            if  square_info == EMPTY:
                 pos_moves[(row,col)] = True
-            elif square_info == BoardInfo.BLACK:
+            elif square_info == self._enemy:
                 pos_moves[(row,col)] = True
                 return pos_moves
-            elif square_info == BoardInfo.WHITE:
+            else:
                 return pos_moves
         return pos_moves
     
@@ -147,13 +203,7 @@ class ChessPiece():
         row_sign = sign(row_diff)
         col_sign = sign(col_diff)
 
-        direction_dict = {
-            (-1, 0): 0, (0, 1): 1, (1, 0): 2, (0, -1): 3,  # north=0, east=1, south=2, west=3
-            (-1, 1): 4, (1, 1): 5, (1, -1): 6, (-1, -1): 7, # north east=4, south east=5, south west=6, north west=7
-            (0, 0): 8
-        }
-
-        return direction_dict.get((row_sign, col_sign), 8)
+        return DIRECTION_NUMBERS.get((row_sign, col_sign), 8)
     
     def qbr_is_legal_move(self, dest_row, dest_col, board):
         """Legal move checker for Queen, Bishop, and Rook only
@@ -166,20 +216,47 @@ class ChessPiece():
         Returns:
             type: boolean repesting if its a legal move or not
         """
-        # the rules for the possible directions the pieces can move in and then gets the bounds depending on the label
-        # rook can only move in directions 0-3, the bishop 4-7 and the queen can use all 8
-        dir_rules = {'Q':(0, 7), 'B':(4, 7), 'R':(0, 3)} 
-        bounds = dir_rules[self._label.value]
+        if not on_board(dest_row, dest_col):
+            return False
 
-        # gets the direction and checks its to the bounds of the posible directions for the piece type
-        direction = self.determine_direction(dest_row, dest_col)
-        if bounds[0] > direction or direction > bounds[1]:
+        # looks up which ray from this square reaches the destination, -1 if it is not on any ray
+        # the rook can only move in directions 0-3, the bishop 4-7 and the queen can use all 8
+        square = square_index(self._row, self._col)
+        direction = RAY_DIRECTION[square][square_index(dest_row, dest_col)]
+        if direction not in SLIDER_DIRECTIONS[self._char]:
             return False
-        
-        # searches the direction the piece wants to move to make sure there are no pieces in the way of the destination
-        pos_moves = self.search_direction(direction, board)
-        return pos_moves.get((dest_row, dest_col), False)
+
+        # scans the ray up to the destination to make sure there are no pieces in the way
+        for row, col in RAYS[square][direction]:
+            square_info = board.get_square_info(row, col)
+            if row == dest_row and col == dest_col:
+                return self.check_take(square_info)
+            if square_info != EMPTY:
+                return False
+        return False
     
+    def qbr_iter_legal_moves(self, board):
+        """Legal move generator for Queen, Bishop, and Rook only, walks each of the piece's rays
+        until another piece or the end of the board is reached
+
+        Arguments:
+            board(board Object): the current board object to test each space for another piece
+
+        Returns:
+            type: iterator of (row, col) tuples
+        """
+        rays = RAYS[square_index(self._row, self._col)]
+        enemy = self._enemy
+        for direction in SLIDER_DIRECTIONS[self._char]:
+            for row, col in rays[direction]:
+                square_info = board.get_square_info(row, col)
+                if square_info == EMPTY:
+                    yield (row, col)
+                else:
+                    if square_info == enemy:
+                        yield (row, col)
+                    break
+
     def qbr_generate_legal_moves(self, board_data, board):
         """Legal move generator for Queen, Bishop, and Rook only
         
@@ -190,24 +267,7 @@ class ChessPiece():
         Returns:
             type: Board object the passed in board object but now filled with all the possible moves of this piece
         """
-        # adds staring position to the board
-        char_label = self._label.value
-        board_data[self._row][self._col] = char_label
-
-        # dictionary for the ranges to generate the legal moves for each piece
-        move_direction_ranges = {'Q':(8,0), 'B':(4,4), 'R':(4,0)}
-        move_range = move_direction_ranges[self._label.value]
-
-        # gets the possible moves from each direction and appends them to the dictionary of possible moves
-        pos_moves = {}
-        for direction in range(move_range[0]):
-            offset = direction + move_range[1]
-            pos_moves.update(self.search_direction(offset, board))
-
-        # iterates through the dictionary of possible moves and adds them to the board    
-        for move in pos_moves:
-            board_data[move[0]][move[1]] = char_label
-        return board_data
+        return self.fill_moves(board_data, self.qbr_iter_legal_moves(board))
     
 def sign(num):
     """used to normalize the given number
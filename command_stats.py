@@ -0,0 +1,64 @@
+# per command latency statistics for chess_move_checker runs
+# Dane Iwema
+# IT327
+
+import json
+import math
+
+
+def percentile(sorted_values, fraction):
+    """returns the value at a fraction (0-1) of a sorted list using the nearest rank, 0 for an empty list"""
+    if not sorted_values:
+        return 0.0
+    # nearest rank is the ceiling of fraction * n, counted from 1
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies):
+    """returns the count, total and p50/p99 of a list of latencies in seconds"""
+    ordered = sorted(latencies)
+    return {'count': len(ordered), 'total_s': sum(ordered),
+            'p50_s': percentile(ordered, 0.50), 'p99_s': percentile(ordered, 0.99)}
+
+
+class CommandStats():
+    """collects how long every command took, grouped by command and by piece type for move commands
+
+    Attribues:
+        _commands(dictionary): command name to the list of its latencies
+        _pieces(dictionary): (command name, piece label) to the list of its latencies
+    """
+
+    def __init__(self):
+        """CommandStats initializer"""
+        self._commands = {}
+        self._pieces = {}
+
+    def record(self, command, seconds, piece_label=None):
+        """adds one command's latency
+
+        Arguments:
+            command(string): the command name, e.g. checkMove
+            seconds(float): how long the command took
+            piece_label(string): label of the piece on the starting square for move commands, None otherwise
+        """
+        self._commands.setdefault(command, []).append(seconds)
+        if piece_label is not None:
+            self._pieces.setdefault((command, piece_label), []).append(seconds)
+
+    def report(self):
+        """returns every command's summary plus the per piece type breakdown as a dictionary"""
+        pieces = {}
+        for (command, label), latencies in sorted(self._pieces.items()):
+            pieces.setdefault(command, {})[label] = summarize(latencies)
+        return {'commands': {command: summarize(latencies) for command, latencies in sorted(self._commands.items())},
+                'pieces': pieces}
+
+    def write_json(self, filename, extra=None):
+        """writes the report to a JSON file, with the entries of extra added at the top level when given"""
+        report = self.report()
+        if extra:
+            report.update(extra)
+        with open(filename, 'w') as outfile:
+            json.dump(report, outfile, indent=1)
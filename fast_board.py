@@ -0,0 +1,328 @@
+# board with direct access to its pieces and batched move checking
+# Dane Iwema
+# IT327
+
+from board import Board
+from chess_utils import BoardInfo
+from move_cache import SHARED_MOVE_CACHE
+from move_cache import piece_key
+from move_tables import MOVE_BUFFER_SIZE
+from move_tables import MOVE_CAPTURE
+from piece_colors import BLACK
+from array import array
+from collections import deque
+import io
+import sys
+
+# estimated bytes for each (row, col) tuple held in a cached move set
+_SQUARE_BYTES = sys.getsizeof((0, 0))
+
+# moves that can be taken back, older records are dropped so a long run of makeMove without
+# unmakeMove, or a board kept by the server, does not grow without limit
+MAX_UNDO_DEPTH = 4096
+
+
+class FastBoard(Board):
+    """Board that also keeps its own grid of pieces, a zobrist hash of the position and a move cache
+
+    Attribues:
+        _pieces(2D list): the piece on every square, None for an empty square
+        _hash(Integer): zobrist hash of every piece on the board
+        _move_cache(MoveCache): cache of generated moves keyed by position hash and square, None to disable
+        _undo_stack(deque): one (piece, from_row, from_col, to_row, to_col, captured) record per move made,
+            the last MAX_UNDO_DEPTH moves
+        _attack_map(AttackMap): attacker counts per square, None until first asked for
+        _reach_index(ReachIndex): the pieces that can move to each square, None until first asked for
+        _listeners(list): the indexes told about every changed square through square_changed(row, col)
+    """
+
+    def __init__(self, move_cache=SHARED_MOVE_CACHE):
+        """FastBoard initializer
+
+        Arguments:
+            move_cache(MoveCache): the cache to consult, None to always generate moves
+        """
+        Board.__init__(self)
+        self._pieces = [[None] * Board.BOARD_SIZE for _ in range(Board.BOARD_SIZE)]
+        self._hash = 0
+        self._move_cache = move_cache
+        self._undo_stack = deque(maxlen=MAX_UNDO_DEPTH)
+        self._attack_map = None
+        self._reach_index = None
+        self._listeners = []
+
+    def _set_square(self, row, col, piece):
+        """puts a piece (or None) in the piece grid and updates the hash"""
+        self._hash ^= piece_key(self._pieces[row][col], row, col) ^ piece_key(piece, row, col)
+        self._pieces[row][col] = piece
+        self._square_changed(row, col)
+
+    def _square_changed(self, row, col):
+        """passes a changed square on to every index kept up to date with the board"""
+        for listener in self._listeners:
+            listener.square_changed(row, col)
+
+    def add_piece(self, row, col, piece):
+        """adds a piece to the board and records it in the piece grid
+
+        Arguments:
+            row(Integer): the row number
+            col(Integer): the column number
+            piece(ChessPiece): the piece to add, None for an empty square
+        """
+        Board.add_piece(self, row, col, piece)
+        self._set_square(row, col, piece)
+
+    def get_piece(self, row, col):
+        """returns the piece on a square, None if the square is empty or off the board"""
+        if (-1 < row < Board.BOARD_SIZE) and (-1 < col < Board.BOARD_SIZE):
+            return self._pieces[row][col]
+        return None
+
+    def get_hash(self):
+        """returns the zobrist hash of the current position"""
+        return self._hash
+
+    def make_move(self, from_row, from_col, to_row, to_col):
+        """makes a move, keeps the piece grid and hash in sync and records how to undo it
+
+        Returns:
+            type: boolean, True if the move was made
+        """
+        piece = self.get_piece(from_row, from_col)
+        captured = self.get_piece(to_row, to_col)
+        if piece is not None and piece.get_color() == BLACK:
+            # Board only moves white pieces, black moves are made here through add_piece
+            succeeded = self.check_move(from_row, from_col, to_row, to_col)
+            if succeeded:
+                Board.add_piece(self, to_row, to_col, piece)
+                Board.add_piece(self, from_row, from_col, None)
+                piece.move(to_row, to_col)
+        else:
+            succeeded = Board.make_move(self, from_row, from_col, to_row, to_col)
+        if succeeded:
+            # skip the update if Board.make_move already went through add_piece
+            if self.get_piece(to_row, to_col) is not piece:
+                self._set_square(to_row, to_col, piece)
+                self._set_square(from_row, from_col, None)
+            elif self._listeners:
+                # Board's add_piece ran before the piece itself moved, let the indexes see the finished move
+                self._square_changed(to_row, to_col)
+                self._square_changed(from_row, from_col)
+            self._undo_stack.append((piece, from_row, from_col, to_row, to_col, captured))
+        return succeeded
+
+    def unmake_move(self):
+        """takes back the last move made, putting back any captured piece
+
+        Returns:
+            type: the (from_row, from_col, to_row, to_col) of the move taken back, None if there is no move to undo,
+            also once the last MAX_UNDO_DEPTH moves have been taken back
+        """
+        if not self._undo_stack:
+            return None
+        piece, from_row, from_col, to_row, to_col, captured = self._undo_stack.pop()
+        # the pieces are back in place before the grid changes, so the indexes recompute from the restored position
+        piece.move(from_row, from_col)
+        # bitboard pieces also have to put the captured piece back in their shared position
+        position = getattr(captured, '_position', None)
+        if position is not None:
+            position.place(to_row, to_col, captured.get_color())
+        self.add_piece(from_row, from_col, piece)
+        self.add_piece(to_row, to_col, captured)
+        return (from_row, from_col, to_row, to_col)
+
+    def undo_depth(self):
+        """returns how many moves can be taken back"""
+        return len(self._undo_stack)
+
+    def get_legal_moves(self, row, col):
+        """returns the set of squares the piece on (row, col) can move to, using the move cache
+
+        Returns:
+            type: frozenset of (row, col) tuples, empty if there is no piece
+        """
+        piece = self.get_piece(row, col)
+        if piece is None:
+            return frozenset()
+        if self._move_cache is None:
+            return frozenset(piece.get_legal_moves(self))
+        key = ('moves', self._hash, row, col)
+        pos_moves = self._move_cache.get(key)
+        if pos_moves is None:
+            pos_moves = frozenset(piece.get_legal_moves(self))
+            self._move_cache.put(key, pos_moves, sys.getsizeof(pos_moves) + len(pos_moves) * _SQUARE_BYTES)
+        return pos_moves
+
+    def check_move(self, from_row, from_col, to_row, to_col):
+        """checks a move against the cached move set of the piece on the starting square
+
+        Returns:
+            type: boolean
+        """
+        if self._move_cache is None:
+            piece = self.get_piece(from_row, from_col)
+            # Board only checks white pieces, black pieces answer for themselves
+            if piece is not None and piece.get_color() == BLACK:
+                return piece.is_legal_move(to_row, to_col, self)
+            return Board.check_move(self, from_row, from_col, to_row, to_col)
+        return (to_row, to_col) in self.get_legal_moves(from_row, from_col)
+
+    def display_possible_moves(self, row, col, outfile):
+        """writes the possible moves grid for a square, reusing the text from the cache when the position repeats"""
+        if self._move_cache is None:
+            Board.display_possible_moves(self, row, col, outfile)
+            return
+        key = ('text', self._hash, row, col)
+        text = self._move_cache.get(key)
+        if text is None:
+            buffer = io.StringIO()
+            Board.display_possible_moves(self, row, col, buffer)
+            text = buffer.getvalue()
+            self._move_cache.put(key, text, sys.getsizeof(text))
+        outfile.write(text)
+
+    def get_attack_map(self):
+        """returns the attack map, building it the first time, after which every change keeps it up to date"""
+        if self._attack_map is None:
+            from attack_map import AttackMap
+            self._attack_map = AttackMap(self)
+            self._listeners.append(self._attack_map)
+        return self._attack_map
+
+    def get_reach_index(self):
+        """returns the reverse move index, building it the first time, after which every change keeps it up to date"""
+        if self._reach_index is None:
+            from reach_index import ReachIndex
+            self._reach_index = ReachIndex(self)
+            self._listeners.append(self._reach_index)
+        return self._reach_index
+
+    def who_can_reach(self, row, col, color=BoardInfo.WHITE):
+        """returns the squares of the pieces of one color that can move to (row, col)
+
+        Returns:
+            type: sorted list of (row, col) tuples
+        """
+        return [(from_row, from_col) for from_row, from_col in self.get_reach_index().reachers(row, col)
+                if self.get_square_info(from_row, from_col) == color]
+
+    def is_in_check(self, color):
+        """returns True if the king of the given color is attacked
+
+        Arguments:
+            color(BoardInfo): BoardInfo.WHITE or BoardInfo.BLACK
+        """
+        return self.get_attack_map().is_in_check(color)
+
+    def get_legal_moves_excluding_check(self, row, col):
+        """returns the moves of the piece on (row, col) that do not leave its own king in check
+
+        Each move is made and taken back again on this board, so no copy is needed.
+
+        Returns:
+            type: set of (row, col) tuples
+        """
+        piece = self.get_piece(row, col)
+        if piece is None:
+            return set()
+        color = piece.get_color()
+        attack_map = self.get_attack_map()
+        legal = set()
+        for to_row, to_col in self.get_legal_moves(row, col):
+            if self.make_move(row, col, to_row, to_col):
+                if not attack_map.is_in_check(color):
+                    legal.add((to_row, to_col))
+                self.unmake_move()
+        return legal
+
+    def display_legal_moves(self, row, col, outfile):
+        """writes the possible moves grid like display_possible_moves but leaving out moves into self check"""
+        piece = self.get_piece(row, col)
+        if piece is None:
+            Board.display_possible_moves(self, row, col, outfile)
+            return
+        squares = self.get_legal_moves_excluding_check(row, col)
+        # Board.display_possible_moves asks the piece on the square for its moves, so a stand in
+        # that only reports the filtered squares is put there while the grid is written
+        Board.add_piece(self, row, col, _FilteredMoves(piece, row, col, squares))
+        try:
+            Board.display_possible_moves(self, row, col, outfile)
+        finally:
+            Board.add_piece(self, row, col, piece)
+
+    def iter_all_moves(self, color):
+        """yields every move of one side as a packed integer, see move_tables.pack_move
+
+        The board must not change while the moves are being read.
+
+        Arguments:
+            color(BoardInfo): the side to move
+        """
+        pieces = self._pieces
+        for square in range(Board.BOARD_SIZE * Board.BOARD_SIZE):
+            row, col = divmod(square, Board.BOARD_SIZE)
+            if pieces[row][col] is None or pieces[row][col].get_color() != color:
+                continue
+            for to_row, to_col in self.get_piece(row, col).iter_legal_moves(self):
+                flags = MOVE_CAPTURE if pieces[to_row][to_col] is not None else 0
+                yield square | (to_row * Board.BOARD_SIZE + to_col) << 6 | flags << 12
+
+    def generate_all_moves(self, color, moves=None):
+        """writes every move of one side into an array of packed moves, visiting each piece once
+
+        Arguments:
+            color(BoardInfo): the side to move
+            moves(array): an array('H') of at least MOVE_BUFFER_SIZE entries to reuse, a new one when None
+
+        Returns:
+            type: (moves, count), the side's moves are moves[:count]
+        """
+        if moves is None:
+            moves = array('H', bytes(2 * MOVE_BUFFER_SIZE))
+        count = 0
+        for move in self.iter_all_moves(color):
+            moves[count] = move
+            count += 1
+        return moves, count
+
+    def check_moves(self, moves):
+        """checks many moves at once, generating each origin piece's moves only once
+
+        Arguments:
+            moves(list): (from_row, from_col, to_row, to_col) tuples
+
+        Returns:
+            type: bytearray with a 1 for every legal move and a 0 for every illegal one, in the order given
+        """
+        results = bytearray(len(moves))
+        reachable = {}
+        for index, (from_row, from_col, to_row, to_col) in enumerate(moves):
+            origin = (from_row, from_col)
+            pos_moves = reachable.get(origin)
+            if pos_moves is None:
+                pos_moves = self.get_legal_moves(from_row, from_col)
+                reachable[origin] = pos_moves
+            if (to_row, to_col) in pos_moves:
+                results[index] = 1
+        return results
+
+
+class _FilteredMoves():
+    """stands in for a piece on the Board while its grid is written, generating only the given squares"""
+
+    def __init__(self, piece, row, col, squares):
+        self._piece = piece
+        self._row = row
+        self._col = col
+        self._squares = squares
+
+    def __getattr__(self, name):
+        return getattr(self._piece, name)
+
+    def generate_legal_moves(self, board_data, board):
+        char_label = self._piece.get_label_char()
+        board_data[self._row][self._col] = char_label
+        for row, col in self._squares:
+            board_data[row][col] = char_label
+        return board_data
@@ -0,0 +1,34 @@
+# board holding one shared piece object per piece type
+# Dane Iwema
+# IT327
+
+from fast_board import FastBoard
+
+
+class FlyweightBoard(FastBoard):
+    """FastBoard whose squares point at shared flyweight pieces instead of one object per piece
+
+    The board's grid is the only record of where each piece stands. Before a piece is asked
+    about its moves it is moved onto the square being asked about, so the shared objects must
+    only be used from one thread at a time.
+    """
+
+    def get_piece(self, row, col):
+        """returns the shared piece for a square after placing it on that square"""
+        piece = FastBoard.get_piece(self, row, col)
+        if piece is not None:
+            piece.move(row, col)
+        return piece
+
+    def check_move(self, from_row, from_col, to_row, to_col):
+        self.get_piece(from_row, from_col)
+        return FastBoard.check_move(self, from_row, from_col, to_row, to_col)
+
+    def make_move(self, from_row, from_col, to_row, to_col):
+        self.get_piece(from_row, from_col)
+        return FastBoard.make_move(self, from_row, from_col, to_row, to_col)
+
+    def display_possible_moves(self, row, col, outfile):
+        self.get_piece(row, col)
+        FastBoard.display_possible_moves(self, row, col, outfile)
+
@@ -0,0 +1,131 @@
+# zobrist position hashing and a bounded LRU cache for generated moves
+# Dane Iwema
+# IT327
+
+from chess_utils import PieceInfo
+from collections import OrderedDict
+from piece_colors import BlackPieceInfo
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(seed, count):
+    """returns count pseudo random 64 bit integers from the splitmix64 sequence starting at seed
+
+    Every run builds the keys, so they come from this short loop rather than importing random.
+    """
+    keys = []
+    state = seed
+    for _ in range(count):
+        state = (state + 0x9E3779B97F4A7C15) & _MASK64
+        mixed = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        mixed = ((mixed ^ (mixed >> 27)) * 0x94D049BB133111EB) & _MASK64
+        keys.append(mixed ^ (mixed >> 31))
+    return keys
+
+
+# one pseudo random 64 bit key per piece label per square, seeded so hashes are the same in every process
+_LABELS = [info.value for info in PieceInfo] + [info.value for info in BlackPieceInfo]
+_KEYS = _splitmix64(327, 64 * len(_LABELS))
+ZOBRIST_KEYS = {label: _KEYS[index * 64:(index + 1) * 64] for index, label in enumerate(_LABELS)}
+
+
+def piece_key(piece, row, col):
+    """returns the zobrist key for a piece standing on a square, 0 for an empty square
+
+    Arguments:
+        piece(ChessPiece): the piece or None
+        row(Integer): the row number
+        col(Integer): the column number
+
+    Returns:
+        type: integer key to xor into the position hash
+    """
+    if piece is None:
+        return 0
+    return ZOBRIST_KEYS[piece.get_label_char()][row * 8 + col]
+
+
+class MoveCache():
+    """least recently used cache bounded by both entry count and an estimate of its size in bytes
+
+    Attribues:
+        max_entries(Integer): the most entries kept before evicting
+        max_bytes(Integer): the most estimated bytes kept before evicting
+        hits(Integer): lookups that found an entry
+        misses(Integer): lookups that did not find an entry
+        evictions(Integer): entries dropped to stay under the limits
+        store(TranspositionStore): an on disk store asked on every miss and given every new entry, None for memory only
+    """
+
+    def __init__(self, max_entries=100000, max_bytes=64 * 1024 * 1024):
+        """MoveCache initializer
+
+        Arguments:
+            max_entries(Integer): the most entries kept before evicting
+            max_bytes(Integer): the most estimated bytes kept before evicting
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.store = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """returns the value stored for key and marks it most recently used, None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            if self.store is not None:
+                stored = self.store.get(key)
+                if stored is not None:
+                    self._insert(key, *stored)
+                    return stored[0]
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, nbytes):
+        """stores a value, evicting the least recently used entries until both limits are met
+
+        Arguments:
+            key(hashable): the cache key
+            value(object): the value to store, must not be None
+            nbytes(Integer): the estimated size of the value in bytes
+        """
+        self._insert(key, value, nbytes)
+        if self.store is not None:
+            self.store.put(key, value, nbytes)
+
+    def _insert(self, key, value, nbytes):
+        """stores a value in memory only, evicting the least recently used entries until both limits are met"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, nbytes)
+        self._bytes += nbytes
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, dropped_bytes) = self._entries.popitem(last=False)
+            self._bytes -= dropped_bytes
+            self.evictions += 1
+
+    def clear(self):
+        """drops every entry, the counters are kept"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """returns the counters and current size as a dictionary"""
+        return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+# cache shared by every FastBoard in the process so positions repeated across files are reused
+SHARED_MOVE_CACHE = MoveCache()
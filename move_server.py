@@ -0,0 +1,341 @@
+# asyncio server speaking the chess_move_checker command vocabulary with boards kept in memory
+# Dane Iwema
+# IT327
+
+from board import Board
+from board_loader import parse_board
+from chess_move_checker import ENGINES
+from chess_move_checker import display_possible_moves
+from chess_move_checker import handle_check_moves
+from chess_move_checker import handle_in_check
+from chess_move_checker import handle_move
+from chess_move_checker import handle_unmake_move
+from chess_move_checker import handle_who_can_reach
+from collections import OrderedDict
+import argparse
+import asyncio
+import io
+import itertools
+import time
+
+# every reply ends with this line so pipelining clients know where one reply stops
+END = 'END\n'
+
+# drain the socket once this many bytes of replies are waiting to be sent
+HIGH_WATER = 1 << 16
+
+# named sessions kept before the least recently used one is dropped
+DEFAULT_MAX_SESSIONS = 1024
+
+
+class Session():
+    """a client's board, kept between commands and between connections
+
+    Attribues:
+        session_id(string): the id clients use to come back to this session
+        board(FastBoard): the session's current board, None until readBoard
+        named(boolean): True if a client asked for the session by id, only named sessions outlive their connection
+    """
+
+    def __init__(self, session_id, named=False):
+        """Session initializer"""
+        self.session_id = session_id
+        self.board = None
+        self.named = named
+
+
+class MoveServer():
+    """serves the readBoard, writeBoard, checkMove, checkMoves, makeMove, unmakeMove and genPossMoves
+    commands over TCP or a Unix socket, one line per command
+
+    Clients may send many commands without waiting, the replies come back in order and each one ends
+    with the END line. 'session <id>' attaches the connection to a session, creating it if needed,
+    a connection that never names one gets a session of its own that is dropped when it closes,
+    and past max_sessions named sessions the least recently attached one is dropped,
+    'stats' replies with the request count and rate, and 'quit' closes the connection.
+
+    Attribues:
+        engine(string): the move generation engine used for every board
+        sessions(dictionary): session id to Session
+        max_sessions(Integer): the most named sessions kept
+        requests(Integer): the number of commands answered
+        evictions(Integer): named sessions dropped to stay under max_sessions
+        _named(OrderedDict): session id to the named Session, least recently attached first
+    """
+
+    def __init__(self, engine='classic', max_sessions=DEFAULT_MAX_SESSIONS):
+        """MoveServer initializer
+
+        Arguments:
+            engine(string): the move generation engine, one of ENGINES
+            max_sessions(Integer): the most named sessions kept
+        """
+        self.engine = engine
+        self.sessions = {}
+        self.max_sessions = max_sessions
+        self.requests = 0
+        self.evictions = 0
+        self._named = OrderedDict()
+        self._started = time.perf_counter()
+        self._session_ids = itertools.count(1)
+
+    def get_session(self, session_id=None):
+        """returns the session for an id, creating it, or a new unnamed session with a fresh id when session_id is None"""
+        named = session_id is not None
+        if not named:
+            session_id = str(next(self._session_ids))
+            while session_id in self.sessions:
+                session_id = str(next(self._session_ids))
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = Session(session_id, named)
+            self.sessions[session_id] = session
+        elif named:
+            session.named = True
+        if named:
+            self._named[session_id] = session
+            self._named.move_to_end(session_id)
+            while len(self._named) > self.max_sessions:
+                old_id, old = self._named.popitem(last=False)
+                # a connection still attached keeps using the board, it just can no longer be come back to
+                old.named = False
+                if self.sessions.get(old_id) is old:
+                    del self.sessions[old_id]
+                self.evictions += 1
+        return session
+
+    def release_session(self, session):
+        """forgets a session its connection is done with, unless a client named it and may come back"""
+        if not session.named and self.sessions.get(session.session_id) is session:
+            del self.sessions[session.session_id]
+
+    def requests_per_second(self):
+        """returns the average number of commands answered per second since the server started"""
+        elapsed = time.perf_counter() - self._started
+        return self.requests / elapsed if elapsed > 0 else 0.0
+
+    def run_command(self, session, args, outfile):
+        """runs one command other than readBoard against the session's board
+
+        Arguments:
+            session(Session): the client's session
+            args(list): the command split into words
+            outfile(file): where the reply text is written
+        """
+        board = session.board
+        if args[0] == 'stats':
+            outfile.write("requests {} sessions {} requests/s {:.1f}\n".format(
+                self.requests, len(self.sessions), self.requests_per_second()))
+        elif board is None:
+            outfile.write("Error: no board, send readBoard first\n")
+        elif args[0] == 'writeBoard':
+            board.write_to_file(outfile)
+        elif args[0] == 'checkMove':
+            handle_move(args[1:], board, outfile, False)
+        elif args[0] == 'checkMoves':
+            handle_check_moves(args[1:], board, outfile)
+        elif args[0] == 'makeMove':
+            handle_move(args[1:], board, outfile, True)
+        elif args[0] == 'unmakeMove':
+            handle_unmake_move(board, outfile)
+        elif args[0] == 'genPossMoves':
+            display_possible_moves(args[1:], board, outfile)
+        elif args[0] == 'inCheck':
+            handle_in_check(board, outfile)
+        elif args[0] == 'whoCanReach':
+            handle_who_can_reach(args[1:], board, outfile)
+        else:
+            outfile.write("Error: unknown command " + args[0] + "\n")
+
+    async def handle_client(self, reader, writer):
+        """reads commands from one connection until it sends quit or closes"""
+        session = self.get_session()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = line.decode().split()
+                if not args:
+                    continue
+                if args[0] == 'quit':
+                    break
+                outfile = io.StringIO()
+                if args[0] == 'session':
+                    self.release_session(session)
+                    session = self.get_session(args[1] if len(args) > 1 else None)
+                    outfile.write("Session " + session.session_id + "\n")
+                elif args[0] == 'readBoard':
+                    rows = [(await reader.readline()).decode() for _ in range(Board.BOARD_SIZE)]
+                    try:
+                        session.board = parse_board(rows, self.engine)
+                        outfile.write("Board read\n")
+                    except (IndexError, KeyError):
+                        outfile.write("Error: bad board\n")
+                else:
+                    try:
+                        self.run_command(session, args, outfile)
+                    except (ValueError, IndexError) as error:
+                        outfile.write("Error: " + str(error) + "\n")
+                self.requests += 1
+                outfile.write(END)
+                writer.write(outfile.getvalue().encode())
+                if writer.transport.get_write_buffer_size() > HIGH_WATER:
+                    await writer.drain()
+            await writer.drain()
+        finally:
+            self.release_session(session)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start_tcp(self, host='127.0.0.1', port=0):
+        """starts listening on a TCP port, 0 picks a free one
+
+        Returns:
+            type: asyncio Server
+        """
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def start_unix(self, path):
+        """starts listening on a Unix socket
+
+        Returns:
+            type: asyncio Server
+        """
+        return await asyncio.start_unix_server(self.handle_client, path)
+
+
+async def read_reply(reader):
+    """reads one reply up to its END line
+
+    Returns:
+        type: the reply text without the END line
+    """
+    lines = []
+    while True:
+        line = (await reader.readline()).decode()
+        if line == END or not line:
+            return ''.join(lines)
+        lines.append(line)
+
+
+async def pipeline(reader, writer, commands):
+    """sends every command without waiting and then collects the replies in order
+
+    Arguments:
+        reader(StreamReader): the connection's reader
+        writer(StreamWriter): the connection's writer
+        commands(list): command strings, a readBoard command includes its 8 board lines
+
+    Returns:
+        type: list of reply texts, one per command
+    """
+    writer.write(''.join(command if command.endswith('\n') else command + '\n' for command in commands).encode())
+    await writer.drain()
+    return [await read_reply(reader) for _ in commands]
+
+
+async def close_client(reader, writer):
+    """sends quit and waits for the server to close its end, so its handler has finished"""
+    writer.write(b'quit\n')
+    await writer.drain()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def round_trip_check(engine, board_rows):
+    """runs one command file through a local server and through process_commands and compares the text
+
+    Returns:
+        type: list of problems found, empty if the server answered like the command file driver
+    """
+    from chess_move_checker import process_commands
+    board_text = ''.join(row + '\n' for row in board_rows)
+    commands = ['readBoard\n' + board_text]
+    for row, col in ((0, 1), (1, 3), (3, 3), (6, 2), (7, 4)):
+        commands += ['checkMove {} {} {} {}'.format(row, col, (row + 2) % 8, (col + 1) % 8),
+                     'genPossMoves {} {}'.format(row, col), 'whoCanReach {} {}'.format((row + 2) % 8, col)]
+    commands += ['makeMove 1 3 3 3', 'inCheck', 'writeBoard', 'unmakeMove', 'checkMoves 0 1 2 2 1 0 2 0', 'writeBoard']
+    expected = io.StringIO()
+    process_commands(io.StringIO(''.join(command + '\n' if not command.endswith('\n') else command
+                                         for command in commands) + 'quit\n'), expected, engine)
+
+    problems = []
+    server = MoveServer(engine)
+    listener = await server.start_tcp()
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    replies = await pipeline(reader, writer, commands)
+    await close_client(reader, writer)
+    listener.close()
+    await listener.wait_closed()
+
+    if replies[0] != "Board read\n":
+        problems.append("readBoard replied " + repr(replies[0]))
+    if ''.join(replies[1:]) != expected.getvalue():
+        problems.append("replies differ from the command file output")
+    if server.sessions:
+        problems.append("{} sessions left after the client closed".format(len(server.sessions)))
+    return problems
+
+
+async def benchmark(requests, engine, board_rows):
+    """starts a local server, pipelines requests commands from one client and reports the rate"""
+    server = MoveServer(engine)
+    listener = await server.start_tcp()
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    commands = ['readBoard\n' + ''.join(row + '\n' for row in board_rows)]
+    commands += ['checkMove {} {} {} {}'.format(row, col, (row + 3) % 8, (col + 5) % 8)
+                 for row, col in (divmod(index % 64, 8) for index in range(requests - 1))]
+    start = time.perf_counter()
+    await pipeline(reader, writer, commands)
+    elapsed = time.perf_counter() - start
+    await close_client(reader, writer)
+    listener.close()
+    await listener.wait_closed()
+    print("{} requests in {:.3f}s, {:.0f} requests/s".format(len(commands), elapsed, len(commands) / elapsed))
+
+
+async def serve(args):
+    server = MoveServer(args.engine, args.max_sessions)
+    if args.unix:
+        listener = await server.start_unix(args.unix)
+    else:
+        listener = await server.start_tcp(args.host, args.port)
+    print("listening on " + ", ".join(str(sock.getsockname()) for sock in listener.sockets))
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="serve chess_move_checker commands over a socket")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3270)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--engine', choices=ENGINES, default='classic')
+    parser.add_argument('--max-sessions', type=int, default=DEFAULT_MAX_SESSIONS,
+                        help="named sessions kept before the least recently used is dropped")
+    parser.add_argument('--bench', type=int, metavar='N', help="pipeline N requests to a local server and exit")
+    parser.add_argument('--check', action='store_true',
+                        help="compare a local server's replies with the command file driver and exit")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        from position_corpus import build_corpus
+        problems = asyncio.run(round_trip_check(args.engine, build_corpus(1, 327)[0]))
+        print('\n'.join(problems) if problems else "round trip ok")
+        return 1 if problems else 0
+    if args.bench:
+        from position_corpus import build_corpus
+        asyncio.run(benchmark(args.bench, args.engine, build_corpus(1, 327)[0]))
+    else:
+        asyncio.run(serve(args))
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+# precomputed move tables for every square on the board
+# Dane Iwema
+# IT327
+
+BOARD_SIZE = 8
+
+# the 8 possible sliding directions as [row movement, column movement]
+# north=0, east=1, south=2, west=3, north east=4, south east=5, south west=6, north west=7
+DIRECTIONS = [[-1, 0], [0, 1], [1, 0], [0, -1], [-1, 1], [1, 1], [1, -1], [-1, -1]]
+
+# maps the normalized (row, column) movement to its direction number, 8 if no movement
+DIRECTION_NUMBERS = {
+    (-1, 0): 0, (0, 1): 1, (1, 0): 2, (0, -1): 3,
+    (-1, 1): 4, (1, 1): 5, (1, -1): 6, (-1, -1): 7,
+    (0, 0): 8
+}
+
+# the directions each sliding piece is allowed to use, keyed by label, black pieces use the lower case label
+SLIDER_DIRECTIONS = {'Q': range(0, 8), 'B': range(4, 8), 'R': range(0, 4),
+                     'q': range(0, 8), 'b': range(4, 8), 'r': range(0, 4)}
+
+KNIGHT_OFFSETS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+
+KING_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# white pawns move toward the higher rows, black pawns toward row 0
+PAWN_CAPTURE_OFFSETS = [(1, -1), (1, 1)]
+BLACK_PAWN_CAPTURE_OFFSETS = [(-1, -1), (-1, 1)]
+
+
+def square_index(row, col):
+    """converts a row and column into a 0-63 square index
+
+    Arguments:
+        row(Integer): the row number
+        col(Integer): the column number
+
+    Returns:
+        type: integer square index
+    """
+    return row * BOARD_SIZE + col
+
+
+def on_board(row, col):
+    """checks if a row and column is on the board
+
+    Returns:
+        type: boolean
+    """
+    return (-1 < row < BOARD_SIZE) and (-1 < col < BOARD_SIZE)
+
+
+def _build_ray(row, col, direction):
+    """lists every square from (row, col) to the edge of the board in a direction, nearest first"""
+    move_row, move_col = DIRECTIONS[direction]
+    ray = []
+    row += move_row
+    col += move_col
+    while on_board(row, col):
+        ray.append((row, col))
+        row += move_row
+        col += move_col
+    return tuple(ray)
+
+
+def _build_targets(row, col, offsets):
+    """lists every on board square reached by adding the offsets to (row, col)"""
+    return tuple((row + row_move, col + col_move) for row_move, col_move in offsets
+                 if on_board(row + row_move, col + col_move))
+
+
+def _build_pawn_pushes(row, col, step=1, start_row=1):
+    """lists the one square push and, from the starting row, the two square push"""
+    pushes = []
+    if on_board(row + step, col):
+        pushes.append((row + step, col))
+        if row == start_row:
+            pushes.append((row + 2 * step, col))
+    return tuple(pushes)
+
+
+# every table below is indexed by square_index(row, col) of the moving piece
+# RAYS[square][direction] is the tuple of squares along that direction, nearest first
+RAYS = [tuple(_build_ray(sq // BOARD_SIZE, sq % BOARD_SIZE, direction) for direction in range(8))
+        for sq in range(64)]
+
+# RAY_DIRECTION[square][dest_square] is the direction that reaches dest_square, or -1 if none does
+RAY_DIRECTION = [[-1] * 64 for _ in range(64)]
+for _square in range(64):
+    for _direction in range(8):
+        for _row, _col in RAYS[_square][_direction]:
+            RAY_DIRECTION[_square][square_index(_row, _col)] = _direction
+
+KNIGHT_TARGETS = [_build_targets(sq // BOARD_SIZE, sq % BOARD_SIZE, KNIGHT_OFFSETS) for sq in range(64)]
+KNIGHT_TARGET_SETS = [frozenset(targets) for targets in KNIGHT_TARGETS]
+
+KING_TARGETS = [_build_targets(sq // BOARD_SIZE, sq % BOARD_SIZE, KING_OFFSETS) for sq in range(64)]
+
+PAWN_PUSHES = [_build_pawn_pushes(sq // BOARD_SIZE, sq % BOARD_SIZE) for sq in range(64)]
+PAWN_CAPTURES = [_build_targets(sq // BOARD_SIZE, sq % BOARD_SIZE, PAWN_CAPTURE_OFFSETS) for sq in range(64)]
+
+BLACK_PAWN_PUSHES = [_build_pawn_pushes(sq // BOARD_SIZE, sq % BOARD_SIZE, -1, BOARD_SIZE - 2) for sq in range(64)]
+BLACK_PAWN_CAPTURES = [_build_targets(sq // BOARD_SIZE, sq % BOARD_SIZE, BLACK_PAWN_CAPTURE_OFFSETS)
+                       for sq in range(64)]
+
+# packed moves fit one array('H') entry: bits 0-5 the from square, 6-11 the to square, 12-15 flags
+MOVE_CAPTURE = 1
+
+# one side can never have more moves than 64 squares each holding a queen with its 27 moves
+MOVE_BUFFER_SIZE = 64 * 27
+
+
+def pack_move(from_square, to_square, flags=0):
+    """returns a move packed into a 16 bit integer"""
+    return from_square | to_square << 6 | flags << 12
+
+
+def unpack_move(move):
+    """returns the (from_square, to_square, flags) of a packed move"""
+    return move & 63, move >> 6 & 63, move >> 12
@@ -5,9 +5,20 @@
 from chess_piece import ChessPiece
 from chess_utils import BoardInfo
 from chess_utils import PieceInfo
+from move_tables import BLACK_PAWN_CAPTURES
+from move_tables import BLACK_PAWN_PUSHES
+from move_tables import KNIGHT_TARGETS
+from move_tables import KNIGHT_TARGET_SETS
+from move_tables import PAWN_CAPTURES
+from move_tables import PAWN_PUSHES
+from move_tables import on_board
+from move_tables import square_index
+from piece_colors import BlackPieceInfo
+from piece_colors import EMPTY
+from piece_colors import piece_label
 
 class Knight(ChessPiece):
-    """class definition for a White Knight child of ChessPiece
+    """class definition for a Knight of either color child of ChessPiece
     
     Attribues:
         _row(Integer): the row number
@@ -16,14 +27,17 @@ class Knight(ChessPiece):
         _label(PieceInfo): a PieceInfo enumerator that represents the piece type
     """
 
-    def __init__(self, row_num, col_num):
+    __slots__ = ()
+
+    def __init__(self, row_num, col_num, color=BoardInfo.WHITE):
         """Knight initializer
         
         Arguments:
             c_row_num(Integer): the row number
             c_col_num(Integer): the column number
+            color(BoardInfo): BoardInfo.WHITE or BoardInfo.BLACK
         """
-        ChessPiece.__init__(self, row_num, col_num, BoardInfo.WHITE, PieceInfo.WHITE_KNIGHT)
+        ChessPiece.__init__(self, row_num, col_num, color, piece_label(PieceInfo.WHITE_KNIGHT, color))
         
     def is_legal_move(self, dest_row, dest_col, board):
         """Returns true if this piece can legally move to the specified
@@ -38,13 +52,10 @@ class Knight(ChessPiece):
             type: boolean
         """
 
-        # if the future row or column is in line with the current piece's 
-        # row or column then early return as its impossible for that to be a move
-        if (dest_row == self._row) or (dest_col == self._col):
+        # the destination has to be one of the precomputed on board knight targets for this square
+        if (dest_row, dest_col) not in KNIGHT_TARGET_SETS[square_index(self._row, self._col)]:
             return False
-        move = abs(self._row-dest_row) + abs(self._col-dest_col)
-        is_legal = (move == 3) and self.check_take(board.get_square_info(dest_row, dest_col))
-        return is_legal
+        return self.check_take(board.get_square_info(dest_row, dest_col))
 
     def generate_legal_moves(self, board_data, board):
         """Adds representation for the legal moves to the provided 
@@ -57,38 +68,24 @@ class Knight(ChessPiece):
         Returns:
             type: Board object the passed in board object but now filled with all the possible moves of this piece
         """
-        char_label = self._label.value
-        board_data[self._row][self._col] = char_label
-
-        pos_moves=[-1,1,-2,2] # set up the directions to move the piece
+        return self.fill_moves(board_data, self.iter_legal_moves(board))
 
-        #loop through all the move directions
-        for move in pos_moves:
-
-            #set up the indexes to use depeinding if the move is 1 or not
-            index1 = 0
-            index2 = 1
-            if abs(move) == 1:
-                index1 = 2
-                index2 = 3
-
-            # sets up row and column information and the square type from the given board
-            row = move + self._row
-            col = pos_moves[index1] + self._col
-            # check if the move is legal and then set the board
-            if self.check_take(board.get_square_info(row, col)):
-                board_data[row][col] = char_label
-
-            # reset the col
-            col = pos_moves[index2] + self._col
-
-            # check if the move is legal and then set the board
+    def iter_legal_moves(self, board):
+        """yields every square this piece can move to
+        
+        Attribues:
+            board(Board object): the current locations of every piece on the board
+        
+        Returns:
+            type: iterator of (row, col) tuples
+        """
+        # loop through the on board knight targets for this square and keep the ones the knight can land on
+        for row, col in KNIGHT_TARGETS[square_index(self._row, self._col)]:
             if self.check_take(board.get_square_info(row, col)):
-                board_data[row][col] = char_label
-        return board_data
+                yield (row, col)
 
 class Rook(ChessPiece):
-    """class definition for a White Rook child of ChessPiece
+    """class definition for a Rook of either color child of ChessPiece
     
     Attribues:
         _row(Integer): the row number
@@ -96,14 +93,18 @@ class Rook(ChessPiece):
         _color(BoardInfo): a BoardInfo enumerator that represents Black or White
         _label(PieceInfo): a PieceInfo enumerator that represents the piece type
     """
-    def __init__(self, row_num, col_num):
+
+    __slots__ = ()
+
+    def __init__(self, row_num, col_num, color=BoardInfo.WHITE):
         """Rook initializer
         
         Arguments:
             c_row_num(Integer): the row number
             c_col_num(Integer): the column number
+            color(BoardInfo): BoardInfo.WHITE or BoardInfo.BLACK
         """
-        ChessPiece.__init__(self, row_num, col_num, BoardInfo.WHITE, PieceInfo.WHITE_ROOK)
+        ChessPiece.__init__(self, row_num, col_num, color, piece_label(PieceInfo.WHITE_ROOK, color))
 
     def is_legal_move(self, dest_row, dest_col, board):
         """Returns true if this piece can legally move to the specified
@@ -132,23 +133,33 @@ class Rook(ChessPiece):
         """
         return self.qbr_generate_legal_moves(board_data, board)
 
-class WhitePawn(ChessPiece):
-    """class definition for a White Pawn child of ChessPiece
+    def iter_legal_moves(self, board):
+        """yields every square this piece can move to
+        
+        Attribues:
+            board(Board object): the current locations of every piece on the board
+        
+        Returns:
+            type: iterator of (row, col) tuples
+        """
+        return self.qbr_iter_legal_moves(board)
+
+class Pawn(ChessPiece):
+    """shared move logic for WhitePawn and BlackPawn, which only differ in the tables they move by
     
     Attribues:
         _row(Integer): the row number
         _col(Integer): the column number
         _color(BoardInfo): a BoardInfo enumerator that represents Black or White
         _label(PieceInfo): a PieceInfo enumerator that represents the piece type
+        _pushes(list): class attribute, the pawn push table for the pawn's direction
+        _captures(list): class attribute, the pawn capture table for the pawn's direction
     """
-    def __init__(self, row_num, col_num):
-        """WhitePawn initializer
-        
-        Arguments:
-            c_row_num(Integer): the row number
-            c_col_num(Integer): the column number
-        """
-        ChessPiece.__init__(self, row_num, col_num, BoardInfo.WHITE, PieceInfo.WHITE_PAWN)
+
+    __slots__ = ()
+
+    _pushes = PAWN_PUSHES
+    _captures = PAWN_CAPTURES
 
     def is_legal_move(self, dest_row, dest_col, board):
         """Returns true if this piece can legally move to the specified
@@ -162,15 +173,23 @@ class WhitePawn(ChessPiece):
         Returns:
             type: boolean
         """
-        # check case for moving forward 2 spaces if not in starting position for early return False
-        if dest_row-self._row==2 and self._row != 1:
+        if not on_board(dest_row, dest_col):
             return False
-        
-        pos_moves = {5:1, 6:1, 2:0} # the possible directions for the pawn to move and the conditions to make the move
+        square = square_index(self._row, self._col)
+        dest = (dest_row, dest_col)
 
-        direction = self.determine_direction(dest_row, dest_col) # gets the direction of the move to the destination
-        
-        isLegal = board.get_square_info(dest_row, dest_col).value == pos_moves[direction] # checks the move using the pos_moves for the direction and the condition
+        # a diagonal capture needs a piece of the other color on the destination
+        if dest in self._captures[square]:
+            return board.get_square_info(dest_row, dest_col) == self._enemy
+
+        # a push needs every square up to and including the destination to be empty
+        isLegal = False
+        for push in self._pushes[square]:
+            if board.get_square_info(push[0], push[1]) != EMPTY:
+                return False
+            if push == dest:
+                isLegal = True
+                break
 
         return isLegal
 
@@ -185,25 +204,63 @@ class WhitePawn(ChessPiece):
         Returns:
             type: Board object the passed in board object but now filled with all the possible moves of this piece
         """
-        char_label = self._label.value
-        board_data[self._row][self._col] = char_label
+        return self.fill_moves(board_data, self.iter_legal_moves(board))
+
+    def iter_legal_moves(self, board):
+        """yields every square this piece can move to
+        
+        Attribues:
+            board(Board object): the current locations of every piece on the board
+        
+        Returns:
+            type: iterator of (row, col) tuples
+        """
+        # a diagonal capture is possible when there is a piece of the other color on the square
+        square = square_index(self._row, self._col)
+        enemy = self._enemy
+        for row, col in self._captures[square]:
+            if board.get_square_info(row, col) == enemy:
+                yield (row, col)
+
+        # the pushes stop at the first square that is not empty, the 2 space push is only in the table from the starting row
+        for row, col in self._pushes[square]:
+            if board.get_square_info(row, col) != EMPTY:
+                break
+            yield (row, col)
 
-        # iterates through the 3 possible directions for the pawn to move and the conditions to make the move
-        pos_moves = {(1, -1):1, (1, 1):1, (1, 0):0} 
-        for move, condition in pos_moves.items():
-            row = move[0] + self._row
-            col = move[1] + self._col
-            if board.get_square_info(row, col).value == condition:
-                board_data[row][col] = char_label
+class WhitePawn(Pawn):
+    """class definition for a White Pawn child of Pawn, moves toward the higher rows"""
 
-        # case for moving 2 spaces forward
-        if self._row==1 and board.get_square_info(self._row+2, self._col) == 0:
-            board_data[self._row+2][self._col] = char_label
+    __slots__ = ()
 
-        return board_data
+    def __init__(self, row_num, col_num):
+        """WhitePawn initializer
+        
+        Arguments:
+            c_row_num(Integer): the row number
+            c_col_num(Integer): the column number
+        """
+        ChessPiece.__init__(self, row_num, col_num, BoardInfo.WHITE, PieceInfo.WHITE_PAWN)
+
+class BlackPawn(Pawn):
+    """class definition for a Black Pawn child of Pawn, moves toward row 0"""
+
+    __slots__ = ()
+
+    _pushes = BLACK_PAWN_PUSHES
+    _captures = BLACK_PAWN_CAPTURES
+
+    def __init__(self, row_num, col_num):
+        """BlackPawn initializer
+        
+        Arguments:
+            c_row_num(Integer): the row number
+            c_col_num(Integer): the column number
+        """
+        ChessPiece.__init__(self, row_num, col_num, BoardInfo.BLACK, BlackPieceInfo.BLACK_PAWN)
 
 class Bishop(ChessPiece):
-    """class definition for a White Bishop child of ChessPiece
+    """class definition for a Bishop of either color child of ChessPiece
     
     Attribues:
         _row(Integer): the row number
@@ -211,14 +268,18 @@ class Bishop(ChessPiece):
         _color(BoardInfo): a BoardInfo enumerator that represents Black or White
         _label(PieceInfo): a PieceInfo enumerator that represents the piece type
     """
-    def __init__(self, row_num, col_num):
+
+    __slots__ = ()
+
+    def __init__(self, row_num, col_num, color=BoardInfo.WHITE):
         """Bishop initializer
         
         Arguments:
             c_row_num(Integer): the row number
             c_col_num(Integer): the column number
+            color(BoardInfo): BoardInfo.WHITE or BoardInfo.BLACK
         """
-        ChessPiece.__init__(self, row_num, col_num, BoardInfo.WHITE, PieceInfo.WHITE_BISHOP)
+        ChessPiece.__init__(self, row_num, col_num, color, piece_label(PieceInfo.WHITE_BISHOP, color))
 
     def is_legal_move(self, dest_row, dest_col, board):
         """Returns true if this piece can legally move to the specified
@@ -247,8 +308,19 @@ class Bishop(ChessPiece):
         """
         return self.qbr_generate_legal_moves(board_data, board)
 
+    def iter_legal_moves(self, board):
+        """yields every square this piece can move to
+        
+        Attribues:
+            board(Board object): the current locations of every piece on the board
+        
+        Returns:
+            type: iterator of (row, col) tuples
+        """
+        return self.qbr_iter_legal_moves(board)
+
 class Queen(ChessPiece):
-    """class definition for a White Queen child of ChessPiece
+    """class definition for a Queen of either color child of ChessPiece
     
     Attribues:
         _row(Integer): the row number
@@ -256,14 +328,18 @@ class Queen(ChessPiece):
         _color(BoardInfo): a BoardInfo enumerator that represents Black or White
         _label(PieceInfo): a PieceInfo enumerator that represents the piece type
     """
-    def __init__(self, row_num, col_num):
+
+    __slots__ = ()
+
+    def __init__(self, row_num, col_num, color=BoardInfo.WHITE):
         """Queen initializer
         
         Arguments:
             c_row_num(Integer): the row number
             c_col_num(Integer): the column number
+            color(BoardInfo): BoardInfo.WHITE or BoardInfo.BLACK
         """
-        ChessPiece.__init__(self, row_num, col_num, BoardInfo.WHITE, PieceInfo.WHITE_QUEEN)
+        ChessPiece.__init__(self, row_num, col_num, color, piece_label(PieceInfo.WHITE_QUEEN, color))
     
     def is_legal_move(self, dest_row, dest_col, board):
         """Returns true if this piece can legally move to the specified
@@ -290,4 +366,15 @@ class Queen(ChessPiece):
         Returns:
             type: Board object the passed in board object but now filled with all the possible moves of this piece
         """
-        return self.qbr_generate_legal_moves(board_data, board)
\ No newline at end of file
+        return self.qbr_generate_legal_moves(board_data, board)
+
+    def iter_legal_moves(self, board):
+        """yields every square this piece can move to
+        
+        Attribues:
+            board(Board object): the current locations of every piece on the board
+        
+        Returns:
+            type: iterator of (row, col) tuples
+        """
+        return self.qbr_iter_legal_moves(board)
\ No newline at end of file
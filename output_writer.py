@@ -0,0 +1,61 @@
+# buffered output for command results with an optional JSON Lines copy
+# Dane Iwema
+# IT327
+
+# bytes of text collected before the buffer is written out in one call
+FLUSH_SIZE = 1 << 16
+
+
+class BufferedOutput():
+    """file-like wrapper that collects small writes and passes them on in large blocks
+
+    Attribues:
+        _outfile(file): the text file the blocks are written to
+        _records(file): the JSON Lines file for machine readable results, None if not wanted
+        _parts(list): the pending text, reused between flushes
+        _size(Integer): the number of characters pending
+        _flush_size(Integer): the pending size that triggers a flush
+    """
+
+    def __init__(self, outfile, records=None, flush_size=FLUSH_SIZE):
+        """BufferedOutput initializer
+
+        Arguments:
+            outfile(file): the text file the blocks are written to
+            records(file): an open file for JSON Lines records, None for text only
+            flush_size(Integer): the pending size that triggers a flush
+        """
+        self._outfile = outfile
+        self._records = records
+        self._parts = []
+        self._size = 0
+        self._flush_size = flush_size
+
+    def write(self, text):
+        """queues text, flushing when enough has built up"""
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._flush_size:
+            self.flush()
+
+    def record(self, result):
+        """writes one machine readable result as a JSON line when a records file was given
+
+        Arguments:
+            result(dictionary): the command's result
+        """
+        if self._records is not None:
+            # json is only imported by runs that asked for records
+            import json
+            self._records.write(json.dumps(result, separators=(',', ':')) + '\n')
+
+    def wants_records(self):
+        """returns True if record() writes anywhere, so callers can skip building results"""
+        return self._records is not None
+
+    def flush(self):
+        """writes all pending text in one call"""
+        if self._parts:
+            self._outfile.write(''.join(self._parts))
+            self._parts.clear()
+            self._size = 0
@@ -0,0 +1,60 @@
+# labels and helpers for the black pieces, which PieceInfo only has a single generic label for
+# Dane Iwema
+# IT327
+
+from chess_utils import BoardInfo
+from chess_utils import PieceInfo
+from enum import Enum
+
+# black pieces are written with the lower case of the matching white label, PieceInfo.BLACK stays
+# the generic black piece that cannot move
+BlackPieceInfo = Enum('BlackPieceInfo', [
+    ('BLACK_KING', PieceInfo.WHITE_KING.value.lower()),
+    ('BLACK_KNIGHT', PieceInfo.WHITE_KNIGHT.value.lower()),
+    ('BLACK_ROOK', PieceInfo.WHITE_ROOK.value.lower()),
+    ('BLACK_BISHOP', PieceInfo.WHITE_BISHOP.value.lower()),
+    ('BLACK_PAWN', PieceInfo.WHITE_PAWN.value.lower()),
+    ('BLACK_QUEEN', PieceInfo.WHITE_QUEEN.value.lower()),
+])
+
+# the color members bound once as plain module constants, looking a member up on the Enum class
+# costs several times the comparison it feeds, so the per square checks compare against these
+EMPTY = BoardInfo.EMPTY
+WHITE = BoardInfo.WHITE
+BLACK = BoardInfo.BLACK
+
+# the side each color captures
+OPPONENT = {BoardInfo.WHITE: BoardInfo.BLACK, BoardInfo.BLACK: BoardInfo.WHITE}
+
+# the black label for every white piece label
+BLACK_LABELS = {PieceInfo.WHITE_KING: BlackPieceInfo.BLACK_KING,
+                PieceInfo.WHITE_KNIGHT: BlackPieceInfo.BLACK_KNIGHT,
+                PieceInfo.WHITE_ROOK: BlackPieceInfo.BLACK_ROOK,
+                PieceInfo.WHITE_BISHOP: BlackPieceInfo.BLACK_BISHOP,
+                PieceInfo.WHITE_PAWN: BlackPieceInfo.BLACK_PAWN,
+                PieceInfo.WHITE_QUEEN: BlackPieceInfo.BLACK_QUEEN}
+
+# the color of the piece every label stands for
+LABEL_COLORS = {info.value: BoardInfo.WHITE for info in BLACK_LABELS}
+LABEL_COLORS.update({info.value: BoardInfo.BLACK for info in BlackPieceInfo})
+LABEL_COLORS[PieceInfo.BLACK.value] = BoardInfo.BLACK
+
+
+def piece_label(white_label, color):
+    """returns the label for a piece type in the given color
+
+    Arguments:
+        white_label(PieceInfo): the white label of the piece type
+        color(BoardInfo): BoardInfo.WHITE or BoardInfo.BLACK
+
+    Returns:
+        type: PieceInfo for white, BlackPieceInfo for black
+    """
+    return BLACK_LABELS[white_label] if color == BoardInfo.BLACK else white_label
+
+
+def black_constructor(constructor):
+    """turns a color parameterized piece class into a (row, column) constructor for its black piece"""
+    def make_black(row, column):
+        return constructor(row, column, BoardInfo.BLACK)
+    return make_black
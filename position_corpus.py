@@ -0,0 +1,192 @@
+# fixed width binary corpus of positions with random access through mmap
+# Dane Iwema
+# IT327
+
+from board import Board
+from board_loader import PIECE_CONSTRUCTORS
+from board_loader import is_read_board
+from board_loader import parse_board
+from chess_utils import PieceInfo
+from piece_colors import BlackPieceInfo
+import mmap
+import random
+import struct
+import sys
+
+# file layout: a 16 byte header (magic, board count, reserved) followed by one 32 byte record
+# per board, each byte packs two squares as 4 bit codes with the lower numbered square in the low nibble
+MAGIC = b'CHESSPOS'
+HEADER = struct.Struct('<8sII')
+RECORD_SIZE = 32
+
+# the piece code for every label make_piece knows about, code 0 is an empty square, the black
+# pieces come after the white ones so older files keep their meaning
+CODE_INFO = [PieceInfo.EMPTY, PieceInfo.BLACK, PieceInfo.WHITE_KING, PieceInfo.WHITE_KNIGHT,
+             PieceInfo.WHITE_ROOK, PieceInfo.WHITE_BISHOP, PieceInfo.WHITE_PAWN, PieceInfo.WHITE_QUEEN,
+             BlackPieceInfo.BLACK_KING, BlackPieceInfo.BLACK_KNIGHT, BlackPieceInfo.BLACK_ROOK,
+             BlackPieceInfo.BLACK_BISHOP, BlackPieceInfo.BLACK_PAWN, BlackPieceInfo.BLACK_QUEEN]
+CODE_LABELS = [info.value for info in CODE_INFO]
+LABEL_CODES = {label: code for code, label in enumerate(CODE_LABELS)}
+
+
+def pack_rows(rows):
+    """packs the 8 text rows of a board into a 32 byte record, unknown labels become empty squares
+
+    Arguments:
+        rows(list): the 8 lines of a readBoard block
+
+    Returns:
+        type: bytes of length RECORD_SIZE
+    """
+    codes = [LABEL_CODES.get(rows[row][col], 0) for row in range(Board.BOARD_SIZE) for col in range(Board.BOARD_SIZE)]
+    return bytes(codes[square] | (codes[square + 1] << 4) for square in range(0, 64, 2))
+
+
+def unpack_rows(record):
+    """turns a 32 byte record back into the 8 text rows of the board"""
+    labels = []
+    for byte in record:
+        labels.append(CODE_LABELS[byte & 0x0F])
+        labels.append(CODE_LABELS[byte >> 4])
+    return [''.join(labels[row * Board.BOARD_SIZE:(row + 1) * Board.BOARD_SIZE]) for row in range(Board.BOARD_SIZE)]
+
+
+def iter_command_file_boards(infile):
+    """yields the 8 rows of every readBoard block in an open command file"""
+    for line in infile:
+        if is_read_board(line):
+            yield [infile.readline() for _ in range(Board.BOARD_SIZE)]
+
+
+def build_corpus(positions, seed, pieces=12):
+    """builds the fixed corpus of random positions, the same seed always gives the same boards
+
+    Returns:
+        type: list of positions, each the 8 text rows of a board
+    """
+    rng = random.Random(seed)
+    labels = list(PIECE_CONSTRUCTORS)
+    corpus = []
+    for _ in range(positions):
+        squares = [[PieceInfo.EMPTY.value] * 8 for _ in range(8)]
+        for square in rng.sample(range(64), pieces):
+            squares[square // 8][square % 8] = rng.choice(labels)
+        corpus.append([''.join(row) for row in squares])
+    return corpus
+
+
+def write_corpus(outfilename, boards_rows):
+    """writes a corpus file
+
+    Arguments:
+        outfilename(string): the corpus file to create
+        boards_rows(iterable): the 8 text rows of each board
+
+    Returns:
+        type: the number of boards written
+    """
+    count = 0
+    with open(outfilename, 'wb') as outfile:
+        outfile.write(HEADER.pack(MAGIC, 0, 0))
+        for rows in boards_rows:
+            outfile.write(pack_rows(rows))
+            count += 1
+        outfile.seek(0)
+        outfile.write(HEADER.pack(MAGIC, count, 0))
+    return count
+
+
+def convert_command_files(infilenames, outfilename):
+    """writes every readBoard block from the command files into one corpus file, in order
+
+    Returns:
+        type: the number of boards written
+    """
+    def all_boards():
+        for infilename in infilenames:
+            with open(infilename, 'r') as infile:
+                yield from iter_command_file_boards(infile)
+    return write_corpus(outfilename, all_boards())
+
+
+class PositionCorpus():
+    """read only view of a corpus file, boards are only decoded when asked for
+
+    The file is memory mapped so opening it reads nothing but the header and worker
+    processes opening the same file share its pages.
+
+    Attribues:
+        _file(file): the open corpus file
+        _map(mmap): the memory map of the whole file
+        _count(Integer): the number of boards in the file
+    """
+
+    def __init__(self, filename):
+        """PositionCorpus initializer
+
+        Arguments:
+            filename(string): the corpus file to open
+        """
+        self._file = open(filename, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self._count * RECORD_SIZE:
+            self.close()
+            raise ValueError(filename + " is not a position corpus file")
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """unmaps and closes the file"""
+        self._map.close()
+        self._file.close()
+
+    def record(self, index):
+        """returns the raw 32 byte record for board index"""
+        if not -1 < index < self._count:
+            raise IndexError("board index out of range")
+        start = HEADER.size + index * RECORD_SIZE
+        return self._map[start:start + RECORD_SIZE]
+
+    def records(self, start=0, stop=None):
+        """returns a zero copy view of the records for boards start up to stop
+
+        Returns:
+            type: memoryview of (stop - start) * RECORD_SIZE bytes
+        """
+        if stop is None:
+            stop = self._count
+        if not 0 <= start <= stop <= self._count:
+            raise IndexError("board index out of range")
+        return memoryview(self._map)[HEADER.size + start * RECORD_SIZE:HEADER.size + stop * RECORD_SIZE]
+
+    def rows(self, index):
+        """returns the 8 text rows for board index"""
+        return unpack_rows(self.record(index))
+
+    def board(self, index, engine='classic'):
+        """builds the board for board index
+
+        Arguments:
+            index(Integer): which board, 0 based
+            engine(string): one of chess_move_checker.ENGINES
+
+        Returns:
+            type: FastBoard
+        """
+        return parse_board(self.rows(index), engine)
+
+
+if __name__ == '__main__':
+    # convert command files into a corpus: position_corpus.py corpusfile commandfile...
+    if len(sys.argv) < 3:
+        print("correct usage: "+sys.argv[0]+" corpusfilename commandfilename...")
+        sys.exit(1)
+    print(str(convert_command_files(sys.argv[2:], sys.argv[1])) + " boards written to " + sys.argv[1])
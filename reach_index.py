@@ -0,0 +1,102 @@
+# reverse index from each square to the pieces that can move there
+# Dane Iwema
+# IT327
+
+from attack_map import JUMP_ATTACKS
+from attack_map import SLIDE_ATTACKS
+from chess_utils import PieceInfo
+from move_tables import BLACK_PAWN_PUSHES
+from move_tables import BOARD_SIZE
+from move_tables import PAWN_PUSHES
+from move_tables import RAYS
+from piece_colors import BlackPieceInfo
+from piece_colors import EMPTY
+
+# the push squares a pawn's moves also depend on, by label
+PAWN_PUSH_TABLES = {PieceInfo.WHITE_PAWN.value: PAWN_PUSHES, BlackPieceInfo.BLACK_PAWN.value: BLACK_PAWN_PUSHES}
+
+
+class ReachIndex():
+    """for every square, the squares holding a piece that can currently move there
+
+    Every piece's move set is generated once. Each piece also records the squares its moves
+    depend on (its jump targets, or its rays up to and including the first blocker), so when a
+    square changes only the piece standing on it and the pieces watching it are generated again.
+
+    Attribues:
+        _board(FastBoard): the board being tracked
+        _reachers(list): for every square, the set of origin squares whose piece can move there
+        _moves(list): for every square, the destination squares of the piece standing there
+        _watchers(list): for every square, the set of origin squares whose moves depend on it
+        _watched(list): for every square, the squares the moves of the piece standing there depend on
+    """
+
+    def __init__(self, board):
+        """ReachIndex initializer, generates the moves of every piece on the board once
+
+        Arguments:
+            board(FastBoard): the board to track
+        """
+        self._board = board
+        self._reachers = [set() for _ in range(64)]
+        self._moves = [()] * 64
+        self._watchers = [set() for _ in range(64)]
+        self._watched = [()] * 64
+        for square in range(64):
+            self._add(square)
+
+    def _watch_list(self, square, label):
+        """returns the squares the moves of a piece with the given label on square depend on"""
+        jumps = JUMP_ATTACKS.get(label)
+        if jumps is not None:
+            watched = [row * BOARD_SIZE + col for row, col in jumps[square]]
+            pushes = PAWN_PUSH_TABLES.get(label)
+            if pushes is not None:
+                watched += [row * BOARD_SIZE + col for row, col in pushes[square]]
+            return watched
+        directions = SLIDE_ATTACKS.get(label)
+        if directions is None:
+            return []
+        watched = []
+        for direction in directions:
+            for row, col in RAYS[square][direction]:
+                watched.append(row * BOARD_SIZE + col)
+                if self._board.get_square_info(row, col) != EMPTY:
+                    break
+        return watched
+
+    def _add(self, square):
+        """generates and records the moves of the piece currently on square"""
+        row, col = divmod(square, BOARD_SIZE)
+        piece = self._board.get_piece(row, col)
+        if piece is None:
+            return
+        # the piece's own generator, not the board's move cache, the board can be part way through a move
+        moves = [to_row * BOARD_SIZE + to_col for to_row, to_col in piece.get_legal_moves(self._board)]
+        for target in moves:
+            self._reachers[target].add(square)
+        self._moves[square] = moves
+        watched = self._watch_list(square, piece.get_label_char())
+        for target in watched:
+            self._watchers[target].add(square)
+        self._watched[square] = watched
+
+    def _remove(self, square):
+        """forgets the moves recorded for square"""
+        for target in self._moves[square]:
+            self._reachers[target].discard(square)
+        for target in self._watched[square]:
+            self._watchers[target].discard(square)
+        self._moves[square] = ()
+        self._watched[square] = ()
+
+    def square_changed(self, row, col):
+        """updates the index after the piece on (row, col) was added, removed or replaced"""
+        square = row * BOARD_SIZE + col
+        for origin in [square] + [origin for origin in self._watchers[square] if origin != square]:
+            self._remove(origin)
+            self._add(origin)
+
+    def reachers(self, row, col):
+        """returns the origin squares of every piece that can move to (row, col), as (row, col) tuples"""
+        return sorted(divmod(origin, BOARD_SIZE) for origin in self._reachers[row * BOARD_SIZE + col])
@@ -0,0 +1,127 @@
+# occupancy indexed move tables for the sliding pieces, a whole line is one table lookup
+# Dane Iwema
+# IT327
+
+from bitboard_engine import BITBOARD_CONSTRUCTORS
+from bitboard_engine import BitboardSlider
+from bitboard_engine import RAY_MASKS
+from bitboard_engine import slider_attacks
+from chess_utils import PieceInfo
+from move_tables import RAYS
+from move_tables import square_index
+from my_pieces import Bishop
+from my_pieces import Queen
+from my_pieces import Rook
+from piece_colors import BlackPieceInfo
+from piece_colors import black_constructor
+
+# the two opposite directions making up each line through a square: rank, file, diagonal, anti diagonal
+LINES = ((1, 3), (0, 2), (5, 7), (4, 6))
+
+# the lines each sliding piece moves along, by label
+SLIDER_LINES = {PieceInfo.WHITE_ROOK.value: (0, 1), PieceInfo.WHITE_BISHOP.value: (2, 3),
+                PieceInfo.WHITE_QUEEN.value: (0, 1, 2, 3),
+                BlackPieceInfo.BLACK_ROOK.value: (0, 1), BlackPieceInfo.BLACK_BISHOP.value: (2, 3),
+                BlackPieceInfo.BLACK_QUEEN.value: (0, 1, 2, 3)}
+
+
+def relevant_mask(square, line):
+    """returns the bitboard of the squares on a line whose occupancy can change the moves from square
+
+    The last square of each ray is left out, a piece standing there is reached whether or not it is there.
+    """
+    mask = 0
+    for direction in LINES[line]:
+        ray = RAYS[square][direction]
+        if len(ray) > 1:
+            mask |= RAY_MASKS[direction][square] & ~(1 << square_index(*ray[-1]))
+    return mask
+
+
+def build_line_table(square, line):
+    """returns (mask, table) for one line through a square
+
+    table maps every subset of mask to the bitboard of the squares reachable along the line, including
+    the first blocker in each direction. The subsets are walked with the carry rippler, subset - mask & mask.
+    """
+    mask = relevant_mask(square, line)
+    directions = LINES[line]
+    table = {}
+    subset = 0
+    while True:
+        table[subset] = slider_attacks(square, directions, subset)
+        subset = (subset - mask) & mask
+        if subset == 0:
+            return mask, table
+
+
+def build_slider_tables():
+    """builds the (mask, table) pairs for every line through every square
+
+    Returns:
+        type: list indexed by square of a tuple with one (mask, table) pair per line
+    """
+    return [tuple(build_line_table(square, line) for line in range(len(LINES))) for square in range(64)]
+
+
+LINE_TABLES = build_slider_tables()
+
+# SLIDER_LOOKUPS[label][square] is the (mask, table) pairs a piece with that label on square looks up
+SLIDER_LOOKUPS = {label: [tuple(LINE_TABLES[square][line] for line in lines) for square in range(64)]
+                  for label, lines in SLIDER_LINES.items()}
+
+
+def table_slider_attacks(lookups, occupied):
+    """finds every square a sliding piece can reach with one table lookup per line
+
+    Arguments:
+        lookups(tuple): the piece's (mask, table) pairs from SLIDER_LOOKUPS
+        occupied(Integer): bitboard of every occupied square
+
+    Returns:
+        type: bitboard of the reachable squares including the first blocker in each direction
+    """
+    attacks = 0
+    for mask, table in lookups:
+        attacks |= table[occupied & mask]
+    return attacks
+
+
+class LookupSlider(BitboardSlider):
+    """shared attacks() for the Queen, Bishop, and Rook, read from the occupancy indexed line tables"""
+
+    __slots__ = ()
+
+    def attacks(self):
+        lookups = SLIDER_LOOKUPS[self._char][square_index(self._row, self._col)]
+        return table_slider_attacks(lookups, self._position.occupied()) & ~self.own_pieces()
+
+
+class LookupRook(LookupSlider, Rook):
+    """Rook using the line tables"""
+
+    __slots__ = ('_position',)
+
+
+class LookupBishop(LookupSlider, Bishop):
+    """Bishop using the line tables"""
+
+    __slots__ = ('_position',)
+
+
+class LookupQueen(LookupSlider, Queen):
+    """Queen using the line tables"""
+
+    __slots__ = ('_position',)
+
+
+# the bitboard engine's constructors with the sliders swapped for their table versions
+LOOKUP_CONSTRUCTORS = dict(BITBOARD_CONSTRUCTORS)
+LOOKUP_CONSTRUCTORS.update({
+    PieceInfo.WHITE_ROOK.value: LookupRook,
+    PieceInfo.WHITE_BISHOP.value: LookupBishop,
+    PieceInfo.WHITE_QUEEN.value: LookupQueen,
+    BlackPieceInfo.BLACK_ROOK.value: black_constructor(LookupRook),
+    BlackPieceInfo.BLACK_BISHOP.value: black_constructor(LookupBishop),
+    BlackPieceInfo.BLACK_QUEEN.value: black_constructor(LookupQueen),
+})
@@ -0,0 +1,119 @@
+# board that keeps only the labels of occupied squares and builds pieces on demand
+# Dane Iwema
+# IT327
+
+from board import Board
+from fast_board import FastBoard
+from move_cache import SHARED_MOVE_CACHE
+from move_cache import ZOBRIST_KEYS
+from move_tables import MOVE_CAPTURE
+from piece_colors import EMPTY
+from piece_colors import LABEL_COLORS
+
+
+class SparseBoard(FastBoard):
+    """FastBoard for positions with few pieces, only occupied squares are stored and a piece object
+    is built the first time a command touches its square
+
+    Board's own grid only ever holds the pieces built so far, so every method that passes work on
+    to Board builds the pieces it needs first.
+
+    Attribues:
+        _labels(dictionary): square index to the label of the piece standing there, occupied squares only
+        _pieces(dictionary): square index to the piece built for that square
+        _constructors(dictionary): label to the constructor used to build a piece
+    """
+
+    def __init__(self, constructors, move_cache=SHARED_MOVE_CACHE):
+        """SparseBoard initializer
+
+        Arguments:
+            constructors(dictionary): label to piece constructor taking (row, col)
+            move_cache(MoveCache): the cache to consult, None to always generate moves
+        """
+        FastBoard.__init__(self, move_cache)
+        self._labels = {}
+        self._pieces = {}
+        self._constructors = constructors
+
+    def place_label(self, row, col, label):
+        """puts a piece on a square by its label without building it, unknown labels leave the square empty"""
+        square = row * Board.BOARD_SIZE + col
+        old = self._labels.pop(square, None)
+        if old is not None:
+            self._hash ^= ZOBRIST_KEYS[old][square]
+        if self._pieces.pop(square, None) is not None:
+            Board.add_piece(self, row, col, None)
+        if label in self._constructors:
+            self._labels[square] = label
+            self._hash ^= ZOBRIST_KEYS[label][square]
+        self._square_changed(row, col)
+
+    def _set_square(self, row, col, piece):
+        """records a piece (or None) that Board's grid already holds and updates the hash"""
+        square = row * Board.BOARD_SIZE + col
+        old = self._labels.pop(square, None)
+        if old is not None:
+            self._hash ^= ZOBRIST_KEYS[old][square]
+        if piece is None:
+            self._pieces.pop(square, None)
+        else:
+            label = piece.get_label_char()
+            self._labels[square] = label
+            self._pieces[square] = piece
+            self._hash ^= ZOBRIST_KEYS[label][square]
+        self._square_changed(row, col)
+
+    def get_piece(self, row, col):
+        """returns the piece on a square, building it first if it has not been touched yet"""
+        if not ((-1 < row < Board.BOARD_SIZE) and (-1 < col < Board.BOARD_SIZE)):
+            return None
+        square = row * Board.BOARD_SIZE + col
+        piece = self._pieces.get(square)
+        if piece is None:
+            label = self._labels.get(square)
+            if label is None:
+                return None
+            piece = self._constructors[label](row, col)
+            self._pieces[square] = piece
+            Board.add_piece(self, row, col, piece)
+        return piece
+
+    def get_square_info(self, row, col):
+        """answers from the stored labels without building any piece"""
+        if not ((-1 < row < Board.BOARD_SIZE) and (-1 < col < Board.BOARD_SIZE)):
+            return Board.get_square_info(self, row, col)
+        label = self._labels.get(row * Board.BOARD_SIZE + col)
+        if label is None:
+            return EMPTY
+        return LABEL_COLORS[label]
+
+    def piece_count(self):
+        """returns (occupied squares, pieces built so far)"""
+        return len(self._labels), len(self._pieces)
+
+    def check_move(self, from_row, from_col, to_row, to_col):
+        self.get_piece(from_row, from_col)
+        return FastBoard.check_move(self, from_row, from_col, to_row, to_col)
+
+    def display_possible_moves(self, row, col, outfile):
+        self.get_piece(row, col)
+        FastBoard.display_possible_moves(self, row, col, outfile)
+
+    def write_to_file(self, outfile):
+        """builds every piece so Board's grid is complete, then writes the board"""
+        for square in list(self._labels):
+            self.get_piece(square // Board.BOARD_SIZE, square % Board.BOARD_SIZE)
+        Board.write_to_file(self, outfile)
+
+    def iter_all_moves(self, color):
+        """yields every move of one side as a packed integer, building only that side's pieces"""
+        labels = self._labels
+        for square in sorted(labels):
+            if LABEL_COLORS[labels[square]] != color:
+                continue
+            row, col = divmod(square, Board.BOARD_SIZE)
+            for to_row, to_col in self.get_piece(row, col).iter_legal_moves(self):
+                to_square = to_row * Board.BOARD_SIZE + to_col
+                flags = MOVE_CAPTURE if to_square in labels else 0
+                yield square | to_square << 6 | flags << 12
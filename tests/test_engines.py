@@ -0,0 +1,87 @@
+# every engine against the classic pieces and the original program on random boards
+# Dane Iwema
+# IT327
+
+from board_loader import parse_board
+from chess_move_checker import ENGINES
+from chess_utils import BoardInfo
+from position_corpus import build_corpus
+import io
+import pytest
+import random
+
+SQUARES = [divmod(square, 8) for square in range(64)]
+
+# the labels the original program knew about, it read every other label as an empty square
+ORIGINAL_LABELS = 'XKNRBPQ'
+
+# the original pawn let a pawn move any distance straight ahead or diagonally onto an empty square and
+# raised KeyError sideways and backwards, the pawns were corrected rather than kept, so they stand on the
+# boards but their own moves are not compared
+CORRECTED_LABELS = 'P'
+
+
+def original_corpus(positions, seed, pieces=12):
+    """random boards using only ORIGINAL_LABELS, as lists of 8 text rows"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(positions):
+        squares = [['.'] * 8 for _ in range(8)]
+        for square in rng.sample(range(64), pieces):
+            squares[square // 8][square % 8] = rng.choice(ORIGINAL_LABELS)
+        corpus.append([''.join(row) for row in squares])
+    return corpus
+
+
+def genposs_text(board, row, col):
+    outfile = io.StringIO()
+    board.display_possible_moves(row, col, outfile)
+    return outfile.getvalue()
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return build_corpus(60, 327)
+
+
+@pytest.mark.parametrize('engine', [engine for engine in ENGINES if engine != 'classic'])
+def test_engine_matches_classic(engine, corpus):
+    for rows in corpus:
+        classic = parse_board(rows, 'classic')
+        board = parse_board(rows, engine)
+        for row, col in SQUARES:
+            piece = classic.get_piece(row, col)
+            assert board.get_square_info(row, col) == classic.get_square_info(row, col)
+            if piece is None:
+                continue
+            assert board.get_legal_moves(row, col) == classic.get_legal_moves(row, col), (rows, row, col)
+            if piece.get_color() == BoardInfo.WHITE:
+                assert genposs_text(board, row, col) == genposs_text(classic, row, col)
+                for to_row, to_col in SQUARES:
+                    assert board.check_move(row, col, to_row, to_col) == \
+                        classic.check_move(row, col, to_row, to_col), (rows, row, col, to_row, to_col)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engine_matches_original_program(engine):
+    bench_board_loader = pytest.importorskip('bench_board_loader')
+    bench_check_move = pytest.importorskip('bench_check_move')
+    try:
+        original_read_board = bench_board_loader.load_legacy_read_board(
+            bench_check_move.resolve_revision(bench_check_move.BASELINE_REVISION))
+    except ValueError as error:
+        pytest.skip(str(error))
+    compared = 0
+    for rows in original_corpus(40, 327):
+        text = ''.join(row + '\n' for row in rows)
+        original = original_read_board(io.StringIO(text))
+        board = parse_board(rows, engine)
+        for row, col in SQUARES:
+            if original.get_square_info(row, col) != BoardInfo.WHITE or rows[row][col] in CORRECTED_LABELS:
+                continue
+            for to_row, to_col in SQUARES:
+                assert board.check_move(row, col, to_row, to_col) == original.check_move(row, col, to_row, to_col), \
+                    (rows, row, col, to_row, to_col)
+                compared += 1
+            assert genposs_text(board, row, col) == genposs_text(original, row, col), (rows, row, col)
+    assert compared
@@ -0,0 +1,78 @@
+# the attack map, reach index and zobrist hash kept up to date move by move against a full recompute
+# Dane Iwema
+# IT327
+
+from attack_map import AttackMap
+from bench_self_play import START_POSITION
+from chess_move_checker import ENGINES
+from chess_move_checker import read_board
+from chess_utils import BoardInfo
+from move_cache import piece_key
+from position_corpus import build_corpus
+from reach_index import ReachIndex
+import io
+import pytest
+import random
+
+SQUARES = [divmod(square, 8) for square in range(64)]
+
+
+def full_hash(board):
+    hashed = 0
+    for row, col in SQUARES:
+        hashed ^= piece_key(board.get_piece(row, col), row, col)
+    return hashed
+
+
+def random_walk(board, rng, steps):
+    """makes and takes back random generated moves, yielding after each one"""
+    color = BoardInfo.WHITE
+    moves = None
+    for _ in range(steps):
+        if board.undo_depth() and rng.random() < 0.3:
+            board.unmake_move()
+        else:
+            moves, count = board.generate_all_moves(color, moves)
+            if count == 0:
+                continue
+            move = moves[rng.randrange(count)]
+            from_row, from_col = divmod(move & 63, 8)
+            to_row, to_col = divmod(move >> 6 & 63, 8)
+            assert board.make_move(from_row, from_col, to_row, to_col)
+        color = BoardInfo.BLACK if color == BoardInfo.WHITE else BoardInfo.WHITE
+        yield
+
+
+def start_texts():
+    return [START_POSITION] + [''.join(row + '\n' for row in rows) for rows in build_corpus(3, 11, 20)]
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_incremental_indexes_match_recompute(engine):
+    for seed, text in enumerate(start_texts()):
+        board = read_board(io.StringIO(text), engine)
+        attack_map = board.get_attack_map()
+        reach_index = board.get_reach_index()
+        for _ in random_walk(board, random.Random(seed), 300):
+            fresh_attacks = AttackMap(board)
+            fresh_reach = ReachIndex(board)
+            for row, col in SQUARES:
+                assert attack_map.attack_counts(row, col) == fresh_attacks.attack_counts(row, col)
+                assert reach_index.reachers(row, col) == fresh_reach.reachers(row, col)
+            assert board.get_hash() == full_hash(board)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_unmake_restores_position(engine):
+    board = read_board(io.StringIO(START_POSITION), engine)
+    start_hash = board.get_hash()
+    start_text = io.StringIO()
+    board.write_to_file(start_text)
+    for _ in random_walk(board, random.Random(5), 200):
+        pass
+    while board.unmake_move() is not None:
+        pass
+    end_text = io.StringIO()
+    board.write_to_file(end_text)
+    assert board.get_hash() == start_hash
+    assert end_text.getvalue() == start_text.getvalue()
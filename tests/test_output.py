@@ -0,0 +1,75 @@
+# the command file output, text and JSON Lines, is the same whichever engine runs it
+# Dane Iwema
+# IT327
+
+from chess_move_checker import ENGINES
+from chess_move_checker import process_commands
+from position_corpus import build_corpus
+import io
+import json
+import pytest
+import random
+
+
+def random_script(seed, boards=8, commands=60):
+    """a command file of random boards, each followed by random commands of every kind"""
+    rng = random.Random(seed)
+    lines = []
+    for index, rows in enumerate(build_corpus(boards, seed, 16)):
+        lines.append('readBoard {}\n'.format(index) if index % 2 else 'readBoard\n')
+        lines.extend(row + '\n' for row in rows)
+        for _ in range(commands):
+            squares = [rng.randrange(8) for _ in range(4)]
+            kind = rng.randrange(9)
+            if kind < 3:
+                lines.append('checkMove {} {} {} {}\n'.format(*squares))
+            elif kind < 5:
+                lines.append('makeMove {} {} {} {}\n'.format(*squares))
+            elif kind == 5:
+                lines.append('genPossMoves {} {}\n'.format(*squares[:2]))
+            elif kind == 6:
+                lines.append('unmakeMove\n')
+            elif kind == 7:
+                lines.append('whoCanReach {} {}\n'.format(*squares[:2]))
+            else:
+                lines.append('checkMoves {} {} {} {} {} {} {} {}\n'.format(*squares, *reversed(squares)))
+        lines.append('inCheck\nwriteBoard\n')
+        if index:
+            lines.append('@1 genPossMoves 0 0\n')
+    lines.append('quit\n')
+    return ''.join(lines)
+
+
+def run(script, engine, delta=False, legal_only=False):
+    outfile = io.StringIO()
+    records = io.StringIO()
+    commands = process_commands(io.StringIO(script), outfile, engine, delta=delta, records=records,
+                                legal_only=legal_only)
+    return commands, outfile.getvalue(), records.getvalue()
+
+
+@pytest.mark.parametrize('delta', [False, True])
+@pytest.mark.parametrize('legal_only', [False, True])
+def test_output_same_for_every_engine(delta, legal_only):
+    script = random_script(327)
+    expected = run(script, 'classic', delta, legal_only)
+    for line in expected[2].splitlines():
+        json.loads(line)
+    for engine in ENGINES[1:]:
+        assert run(script, engine, delta, legal_only) == expected, engine
+
+
+def test_blank_lines_and_quit_are_not_commands():
+    script = random_script(3, boards=1, commands=5)
+    commands, text, _ = run(script, 'classic')
+    spaced = script.replace('\ncheckMove', '\n\n   \ncheckMove')
+    assert run(spaced, 'classic') == (commands, text, run(script, 'classic')[2])
+    assert commands == script.count('\n') - 8 - 1
+
+
+def test_output_kept_when_a_command_fails():
+    script = random_script(3, boards=1, commands=5).replace('quit\n', 'checkMove 1\nquit\n')
+    outfile = io.StringIO()
+    with pytest.raises(IndexError):
+        process_commands(io.StringIO(script), outfile)
+    assert outfile.getvalue() == run(script.replace('checkMove 1\n', ''), 'classic')[1]
@@ -0,0 +1,75 @@
+# the transposition store hands back what earlier runs generated and never serves or clobbers a foreign log
+# Dane Iwema
+# IT327
+
+from chess_move_checker import process_commands
+from move_cache import SHARED_MOVE_CACHE
+from transposition_store import FILE_HEADER
+from transposition_store import MAGIC
+from transposition_store import VERSION
+from transposition_store import TranspositionStore
+from test_output import random_script
+import io
+import pytest
+
+
+@pytest.fixture
+def fresh_cache():
+    SHARED_MOVE_CACHE.clear()
+    yield SHARED_MOVE_CACHE
+    SHARED_MOVE_CACHE.store = None
+    SHARED_MOVE_CACHE.clear()
+
+
+def run_with_store(path, script, engine='classic', max_bytes=64 * 1024 * 1024):
+    SHARED_MOVE_CACHE.clear()
+    outfile = io.StringIO()
+    with TranspositionStore(str(path), max_bytes) as store:
+        SHARED_MOVE_CACHE.store = store
+        try:
+            process_commands(io.StringIO(script), outfile, engine)
+        finally:
+            SHARED_MOVE_CACHE.store = None
+        return outfile.getvalue(), store.stats()
+
+
+def test_second_run_reuses_the_first(tmp_path, fresh_cache):
+    script = random_script(41)
+    plain = io.StringIO()
+    process_commands(io.StringIO(script), plain)
+    first, first_stats = run_with_store(tmp_path / 'moves.log', script)
+    second, second_stats = run_with_store(tmp_path / 'moves.log', script, 'bitboard')
+    assert first == second == plain.getvalue()
+    assert first_stats['appended'] > 0
+    assert second_stats['loaded'] == first_stats['entries']
+    assert second_stats['hits'] > 0 and second_stats['appended'] == 0
+
+
+def test_compaction_keeps_serving_the_same_moves(tmp_path, fresh_cache):
+    script = random_script(42)
+    first, _ = run_with_store(tmp_path / 'moves.log', script, max_bytes=4096)
+    second, stats = run_with_store(tmp_path / 'moves.log', script, max_bytes=4096)
+    assert first == second
+    assert stats['bytes'] <= 4096
+
+
+def test_foreign_file_is_refused_and_left_alone(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'not a move log at all')
+    with pytest.raises(ValueError):
+        TranspositionStore(str(path))
+    assert path.read_bytes() == b'not a move log at all'
+
+
+def test_log_of_other_rules_is_started_over(tmp_path):
+    path = tmp_path / 'moves.log'
+    with TranspositionStore(str(path)) as store:
+        store.put(('moves', 1, 0, 0), frozenset({(1, 1)}), 10)
+        fingerprint = FILE_HEADER.unpack_from(path.read_bytes())[2]
+    data = bytearray(path.read_bytes())
+    FILE_HEADER.pack_into(data, 0, MAGIC, VERSION, fingerprint ^ 1)
+    path.write_bytes(bytes(data))
+    with TranspositionStore(str(path)) as store:
+        assert store.restarted
+        assert len(store) == 0
+        assert store.get(('moves', 1, 0, 0)) is None
@@ -0,0 +1,243 @@
+# on disk store of generated moves keyed by position hash, shared between runs
+# Dane Iwema
+# IT327
+
+from collections import OrderedDict
+from move_cache import ZOBRIST_KEYS
+import hashlib
+import importlib.util
+import os
+import struct
+
+# the log starts with a magic string, the format version and the fingerprint of the move rules it was written under
+FILE_HEADER = struct.Struct('<8sHQ')
+MAGIC = b'CHSMOVES'
+VERSION = 1
+
+# the modules whose code decides which moves are generated, any change to one of them starts a new log
+MOVE_RULE_MODULES = ('board', 'chess_piece', 'mec_pieces', 'my_pieces', 'move_tables', 'piece_colors',
+                     'bitboard_engine', 'slider_tables')
+
+# every record is this header followed by its payload:
+# position hash, entry kind, row, col, the cache's size estimate and the payload length
+HEADER = struct.Struct('<QBBBII')
+
+# the move cache key kinds that are kept, a record stores the index into this tuple
+KINDS = ('moves', 'text')
+
+# when the log grows past its cap it is rewritten with the most recently used entries filling this fraction of it
+COMPACT_FRACTION = 0.5
+
+
+def rules_fingerprint():
+    """returns a 64 bit hash of the zobrist keys, the record layout and the source of MOVE_RULE_MODULES
+
+    A log is only read back when it was written under the same fingerprint, so a change to the hash
+    keys or to how moves are generated can never serve the move sets of the old rules.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((KINDS, HEADER.format)).encode())
+    for label in sorted(ZOBRIST_KEYS):
+        digest.update(label.encode())
+        digest.update(b''.join(key.to_bytes(8, 'little') for key in ZOBRIST_KEYS[label]))
+    for name in MOVE_RULE_MODULES:
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.origin and os.path.exists(spec.origin):
+            with open(spec.origin, 'rb') as source:
+                digest.update(source.read())
+    return int.from_bytes(digest.digest()[:8], 'little')
+
+
+def encode(kind, value):
+    """returns the payload bytes for a move cache value, a set of squares or the text of a grid"""
+    if kind == 'moves':
+        return bytes(row * 8 + col for row, col in sorted(value))
+    return value.encode()
+
+
+def decode(kind, payload):
+    """turns a payload back into the value the move cache stored"""
+    if kind == 'moves':
+        return frozenset(divmod(square, 8) for square in payload)
+    return payload.decode()
+
+
+class TranspositionStore():
+    """append only log of generated move sets and grid texts, with an index of it kept in memory
+
+    Keys are the move cache's (kind, position hash, row, col) tuples. The zobrist hash only depends on
+    which piece stands on which square, so a position reached by different moves, or in an earlier run,
+    finds the same entries. The log is read once when the store is opened to build the index, after which
+    a lookup reads only its own record. Entries are appended and never rewritten, except when the log
+    passes max_bytes, then it is compacted down to the most recently used entries.
+
+    The log starts with FILE_HEADER. A file without the magic string is refused rather than overwritten,
+    a log of another version or written under other move rules (see rules_fingerprint) is started over.
+
+    Attribues:
+        path(string): the log file
+        max_bytes(Integer): the largest the log may grow before it is compacted
+        loaded(Integer): entries found in the log when it was opened
+        hits(Integer): lookups answered from the log
+        misses(Integer): lookups for a key the log does not have
+        appended(Integer): entries added by this run
+        evictions(Integer): entries dropped by compaction
+        restarted(boolean): True if an existing log of another version or fingerprint was started over
+        _fingerprint(Integer): the rules fingerprint of this run
+        _index(OrderedDict): key to (payload offset, payload length, size estimate), least recently used first
+        _file(file): the log opened for reading and appending
+        _end(Integer): the offset the next record is written at
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        """TranspositionStore initializer, opens or creates the log and indexes it
+
+        Arguments:
+            path(string): the log file
+            max_bytes(Integer): the largest the log may grow before it is compacted
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.appended = 0
+        self.evictions = 0
+        self.restarted = False
+        self._fingerprint = rules_fingerprint()
+        self._index = OrderedDict()
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        try:
+            self._end = self._load()
+        except ValueError:
+            self._file.close()
+            raise
+        self.loaded = len(self._index)
+
+    def _file_header(self):
+        return FILE_HEADER.pack(MAGIC, VERSION, self._fingerprint)
+
+    def _load(self):
+        """checks the file header and indexes every complete record, a record cut short by a crash is cut off the log
+
+        Returns:
+            type: the offset just past the last complete record
+
+        Raises:
+            ValueError: the file is not empty and does not start with MAGIC, it is left as it is
+        """
+        data = self._file.read()
+        if data and not data.startswith(MAGIC[:len(data)]):
+            raise ValueError(self.path + " is not a transposition store log")
+        if len(data) < FILE_HEADER.size or FILE_HEADER.unpack_from(data)[1:] != (VERSION, self._fingerprint):
+            # an empty or partly written file, or a log written under other rules, none of it can be reused
+            self.restarted = len(data) >= FILE_HEADER.size
+            self._file.seek(0)
+            self._file.truncate()
+            self._file.write(self._file_header())
+            return FILE_HEADER.size
+        offset = FILE_HEADER.size
+        while offset + HEADER.size <= len(data):
+            position_hash, kind, row, col, nbytes, length = HEADER.unpack_from(data, offset)
+            start = offset + HEADER.size
+            if kind >= len(KINDS) or start + length > len(data):
+                break
+            key = (KINDS[kind], position_hash, row, col)
+            self._index.pop(key, None)
+            self._index[key] = (start, length, nbytes)
+            offset = start + length
+        if offset < len(data):
+            self._file.truncate(offset)
+        return offset
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key):
+        """returns (value, size estimate) for key, None if the log does not have it"""
+        location = self._index.get(key)
+        if location is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._index.move_to_end(key)
+        offset, length, nbytes = location
+        self._file.seek(offset)
+        return decode(key[0], self._file.read(length)), nbytes
+
+    def put(self, key, value, nbytes):
+        """appends an entry unless the log already has it, compacting the log if it grows past max_bytes
+
+        Arguments:
+            key(tuple): the move cache's (kind, position hash, row, col) key, other kinds are ignored
+            value(object): the frozenset of squares or the grid text
+            nbytes(Integer): the move cache's size estimate for the value
+        """
+        if key in self._index or key[0] not in KINDS:
+            return
+        kind, position_hash, row, col = key
+        payload = encode(kind, value)
+        self._file.seek(self._end)
+        self._file.write(HEADER.pack(position_hash, KINDS.index(kind), row, col, nbytes, len(payload)) + payload)
+        self._index[key] = (self._end + HEADER.size, len(payload), nbytes)
+        self._end += HEADER.size + len(payload)
+        self.appended += 1
+        if self._end > self.max_bytes:
+            self.compact()
+
+    def compact(self, target_bytes=None):
+        """rewrites the log with only the most recently used entries that fit in target_bytes
+
+        Arguments:
+            target_bytes(Integer): the size to compact down to, max_bytes * COMPACT_FRACTION when None
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * COMPACT_FRACTION)
+        kept = []
+        size = 0
+        for key in reversed(self._index):
+            offset, length, nbytes = self._index[key]
+            if size + HEADER.size + length > target_bytes:
+                break
+            self._file.seek(offset)
+            kept.append((key, self._file.read(length), nbytes))
+            size += HEADER.size + length
+        self.evictions += len(self._index) - len(kept)
+
+        # written beside the log and renamed over it, so a crash leaves either the old or the new log
+        temp_path = self.path + '.tmp'
+        index = OrderedDict()
+        with open(temp_path, 'wb') as outfile:
+            outfile.write(self._file_header())
+            offset = FILE_HEADER.size
+            for key, payload, nbytes in reversed(kept):
+                kind, position_hash, row, col = key
+                outfile.write(HEADER.pack(position_hash, KINDS.index(kind), row, col, nbytes, len(payload)) + payload)
+                index[key] = (offset + HEADER.size, len(payload), nbytes)
+                offset += HEADER.size + len(payload)
+        self._file.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'r+b')
+        self._index = index
+        self._end = offset
+
+    def stats(self):
+        """returns the counters, the reuse rate and the log size as a dictionary"""
+        lookups = self.hits + self.misses
+        return {'entries': len(self._index), 'bytes': self._end, 'loaded': self.loaded, 'hits': self.hits,
+                'misses': self.misses, 'reuse_rate': self.hits / lookups if lookups else 0.0,
+                'appended': self.appended, 'evictions': self.evictions, 'restarted': self.restarted}
+
+    def close(self):
+        """writes out anything buffered and closes the log"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
@@ -0,0 +1,109 @@
+# numpy move masks for the white pieces across a whole batch of boards at once
+# Dane Iwema
+# IT327
+
+from move_tables import DIRECTIONS
+from move_tables import KNIGHT_OFFSETS
+from move_tables import PAWN_CAPTURE_OFFSETS
+from move_tables import SLIDER_DIRECTIONS
+from position_corpus import CODE_INFO
+from position_corpus import LABEL_CODES
+from position_corpus import RECORD_SIZE
+from chess_utils import PieceInfo
+from piece_colors import BlackPieceInfo
+import numpy as np
+
+# piece codes shared with position_corpus, the codes from WHITE_CODE_MIN up to BLACK_PIECE_CODE_MIN are
+# the white pieces, the generic black piece and every code from BLACK_PIECE_CODE_MIN up are black
+EMPTY_CODE = CODE_INFO.index(PieceInfo.EMPTY)
+BLACK_CODE = CODE_INFO.index(PieceInfo.BLACK)
+WHITE_CODE_MIN = BLACK_CODE + 1
+BLACK_PIECE_CODE_MIN = CODE_INFO.index(BlackPieceInfo.BLACK_KING)
+
+# the labels batch_move_masks returns masks for, the sliding ones take their directions from move_tables
+MASK_LABELS = [PieceInfo.WHITE_KNIGHT.value, PieceInfo.WHITE_PAWN.value, PieceInfo.WHITE_ROOK.value,
+               PieceInfo.WHITE_BISHOP.value, PieceInfo.WHITE_QUEEN.value]
+SLIDER_LABELS = [PieceInfo.WHITE_ROOK.value, PieceInfo.WHITE_BISHOP.value, PieceInfo.WHITE_QUEEN.value]
+
+
+def codes_from_rows(rows):
+    """converts the 8 text rows of a board into an (8, 8) array of piece codes"""
+    return np.array([[LABEL_CODES.get(label, EMPTY_CODE) for label in row[:8]] for row in rows], dtype=np.uint8)
+
+
+def codes_from_records(records, count):
+    """unpacks position_corpus records into an (N, 8, 8) array of piece codes without a python loop per board
+
+    Arguments:
+        records(buffer): count consecutive 32 byte records, e.g. PositionCorpus.records()
+        count(Integer): the number of records
+
+    Returns:
+        type: numpy uint8 array of shape (count, 8, 8)
+    """
+    packed = np.frombuffer(records, dtype=np.uint8, count=count * RECORD_SIZE).reshape(count, RECORD_SIZE)
+    return np.stack([packed & 0x0F, packed >> 4], axis=-1).reshape(count, 8, 8)
+
+
+def shift(masks, row_move, col_move):
+    """moves every set square of an (N, 8, 8) mask by (row_move, col_move), squares pushed off the board are dropped"""
+    shifted = np.zeros_like(masks)
+    rows = slice(max(row_move, 0), 8 + min(row_move, 0))
+    cols = slice(max(col_move, 0), 8 + min(col_move, 0))
+    source_rows = slice(max(-row_move, 0), 8 + min(-row_move, 0))
+    source_cols = slice(max(-col_move, 0), 8 + min(-col_move, 0))
+    shifted[:, rows, cols] = masks[:, source_rows, source_cols]
+    return shifted
+
+
+def slide(pieces, directions, empty, not_white):
+    """finds every square the sliding pieces reach, each ray stopping on its first occupied square"""
+    reach = np.zeros_like(pieces)
+    for direction in directions:
+        row_move, col_move = DIRECTIONS[direction]
+        frontier = pieces
+        for _ in range(7):
+            frontier = shift(frontier, row_move, col_move)
+            reach |= frontier & not_white
+            frontier = frontier & empty
+            if not frontier.any():
+                break
+    return reach
+
+
+def batch_move_masks(codes):
+    """computes, for every board in the batch, the squares each white piece type can move to
+
+    Arguments:
+        codes(numpy array): (N, 8, 8) piece codes as used by position_corpus
+
+    Returns:
+        type: dictionary from piece label to an (N, 8, 8) boolean mask, the union of the moves of
+            every piece of that type on each board
+    """
+    codes = np.asarray(codes, dtype=np.uint8)
+    empty = codes == EMPTY_CODE
+    black = (codes == BLACK_CODE) | (codes >= BLACK_PIECE_CODE_MIN)
+    not_white = (codes < WHITE_CODE_MIN) | (codes >= BLACK_PIECE_CODE_MIN)
+    masks = {}
+
+    knights = codes == LABEL_CODES[PieceInfo.WHITE_KNIGHT.value]
+    reach = np.zeros_like(knights)
+    for row_move, col_move in KNIGHT_OFFSETS:
+        reach |= shift(knights, row_move, col_move)
+    masks[PieceInfo.WHITE_KNIGHT.value] = reach & not_white
+
+    # pawns capture diagonally onto black pieces, push onto empty squares and push twice from row 1
+    pawns = codes == LABEL_CODES[PieceInfo.WHITE_PAWN.value]
+    reach = np.zeros_like(pawns)
+    for row_move, col_move in PAWN_CAPTURE_OFFSETS:
+        reach |= shift(pawns, row_move, col_move) & black
+    reach |= shift(pawns, 1, 0) & empty
+    start_row = np.zeros_like(pawns)
+    start_row[:, 1, :] = pawns[:, 1, :]
+    reach |= shift(shift(start_row, 1, 0) & empty, 1, 0) & empty
+    masks[PieceInfo.WHITE_PAWN.value] = reach
+
+    for label in SLIDER_LABELS:
+        masks[label] = slide(codes == LABEL_CODES[label], SLIDER_DIRECTIONS[label], empty, not_white)
+    return masks